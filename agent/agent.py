@@ -10,20 +10,33 @@
 # ==============================
 
 
+import os
 import time
-import random
-from selenium import webdriver
+from dataclasses import asdict
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import threading   # to run keyboard listener in background
-import keyboard    # type: ignore # capture key presses
 
+from agent import instrument
+from agent.browser import attach_driver, create_driver
+from agent.pool import BrowserPool
+from agent.cache import SearchCache
+from agent.http_search import HttpSearchBackend
+from agent.blocker import attach_blocker
+from agent.frontier import Frontier, VisitedIndex
+from agent.extract import ContentWriter, PageExtractor, content_path
+from agent.governor import MemoryGovernor, clear_caches, recycle_tab
+from agent.history import NavigationHistory, ResidentTabs
+from agent.paths import state_file
+from agent.prefetch import TabPrefetcher
 from agent.scroller import Scroller
+from agent.supervisor import DRIVER_ERRORS, DriverSupervisor
+from agent.search import DEMO_LINKS, SEARCH_ENGINES, EngineStats, SearchRacer, extract_links
 from agent.tracker import SessionTracker
 from agent.dashboard import Dashboard
+from agent.controls import ControlQueue
+from agent.daemon import acquire_browser, release_browser
 
 class BrowserAgent:
     """
@@ -34,95 +47,111 @@ class BrowserAgent:
     - control scrolling state
     - interact with dashboard + tracker
     """
+    # a link that kills the browser this often is skipped
+    MAX_SITE_ATTEMPTS = 2
 
-    def __init__(self):
+    def __init__(self, scroll_mode: str = "step", search_mode: str = "serial", search_backend: str = "browser",
+                 use_cache: bool = True, refresh_cache: bool = False, use_daemon: bool = True,
+                 prefetch_depth: int = 0, prefetch_memory_mb: float = 1500, block_rules=None,
+                 revisit: bool = False, memory_limit_mb: float = 2000, extract_every: int = 0,
+                 recorder=None, replay=None, resident_tabs: int = 3):
         """
         Initialize webdriver, tracker, dashboard with anti-detection measures
+        scroll_mode: "step" (one script call per step) or "raf" (in-page scroll loop)
+        search_mode: "serial" (DuckDuckGo -> Bing -> Google), "race" (first engine wins)
+                     or "merge" (all engines merged under a deadline)
+        search_backend: "browser" (selenium) or "http" (no browser, selenium fallback)
+        use_cache: read/write the on-disk search cache
+        refresh_cache: skip cached results but still store fresh ones
+        use_daemon: attach to a warm browser from the driver daemon when one is running
+        prefetch_depth: next links kept loading in background tabs (0 = off)
+        prefetch_memory_mb: stop opening background tabs above this browser RSS
+        block_rules: BlockRules for devtools request interception (None = off)
+        revisit: also queue pages the visited index saw in the last 24h
+        memory_limit_mb: browser RSS budget, tabs / the browser are recycled
+                         between sites above it (0 = off)
+        extract_every: collect page text / headings / links every N scroll
+                       steps into <session>.content.jsonl.gz (0 = off)
+        recorder: replay.SessionRecorder, writes a trace of this session
+        replay: replay.SessionReplay, commands / clock / pages come from a trace
+        resident_tabs: recently left pages kept open for instant back / forward (0 = reload)
         """
-        # setup Chrome options for fast browsing (optimized for speed)
-        chrome_options = Options()
-        # core performance optimizations
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-images")  # much faster loading
-        chrome_options.add_argument("--no-first-run")
-        chrome_options.add_argument("--disable-default-apps")
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-        chrome_options.add_argument("--disable-client-side-phishing-detection")
-        chrome_options.add_argument("--disable-sync")
-        chrome_options.add_argument("--disable-translate")
-        chrome_options.add_argument("--hide-scrollbars")
-        chrome_options.add_argument("--mute-audio")
-        chrome_options.add_argument("--start-maximized") 
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        # attach to a pre-warmed browser if the daemon has one free,
+        # otherwise launch chrome with fast-browsing options
+        self.daemon_address = acquire_browser() if use_daemon else None
+        if self.daemon_address:
+            print(f"[INFO] Attached to warm browser at {self.daemon_address}")
+            self.driver = attach_driver(self.daemon_address)
+        else:
+            self.driver = create_driver()
+        # deadlines + hang watchdog, restarts a fresh local browser on crashes
+        self.supervisor = DriverSupervisor(self.driver, create_driver)
+        self.memory = MemoryGovernor(self.driver, memory_limit_mb) if memory_limit_mb else None
         
-        # set preferences for additional stealth ye clocking notif & geoloc
-        prefs = {
-            "profile.default_content_setting_values": {
-                "notifications": 2,  
-                "geolocation": 2,     
-            }
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        
-        # random user agents to avoid detection (captcha gng ://)
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.63 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        ]
-        chrome_options.add_argument(f"--user-agent={random.choice(user_agents)}")
-        
-        # initialize driver with options
-        self.driver = webdriver.Chrome(options=chrome_options)
-        
-        self.driver.maximize_window()
-        
-        # execute script to remove webdriver property
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        self.tracker = SessionTracker()
+        # replays run on the trace's virtual clock and keep their records next to it
+        self.replay = replay
+        self.recorder = recorder
+        self.session_hooks = [hook for hook in (replay, recorder) if hook is not None]
+        if replay is not None:
+            self.tracker = SessionTracker(os.path.join(replay.directory, time.strftime("replay-%Y%m%d-%H%M%S.jsonl")),
+                                          clock=replay.clock, wall_clock=replay.wall_clock)
+            # recorded pages are static snapshots, nothing to wait for at the bottom
+            self.scroll_timing = {"clock": replay.clock, "sleep": replay.clock.sleep, "lazy_wait": 0}
+        else:
+            self.tracker = SessionTracker()
+            self.scroll_timing = {}
+        self.extract_every = extract_every
+        self.content = ContentWriter(content_path(self.tracker.path)) if extract_every else None
         self.dashboard = Dashboard()
+        self.scroll_mode = scroll_mode
+        self.pool = None
+        self.search_mode = search_mode
+        self.search_racer = SearchRacer(self.driver, stats=EngineStats(state_file("engine_stats.json")))
+        self.search_backend = search_backend
+        self.http_search = HttpSearchBackend() if search_backend == "http" else None
+        self.cache = SearchCache(state_file("search_cache.sqlite")) if use_cache else None
+        self.refresh_cache = refresh_cache
+        self.last_engine = None
+        self.link_engines = {}
+        # canonical, deduped links to visit + persistent visited index (not for replays)
+        self.frontier = Frontier() if replay is not None else Frontier(VisitedIndex(state_file("visited.sqlite")))
+        self.revisit = revisit
+        # request interception follows the active tab, prefetch tabs get their own
+        self.block_rules = block_rules
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_memory_mb = prefetch_memory_mb
+        self.resident_tabs = resident_tabs
+        self.blocker = attach_blocker(self.driver, block_rules) if block_rules else None
+        self.prefetcher = TabPrefetcher(self.driver, prefetch_depth, prefetch_memory_mb,
+                                        block_rules if self.blocker else None) if prefetch_depth else None
+        self.tabs = ResidentTabs(self.driver, resident_tabs) if resident_tabs else None
+        # pause on END OF PAGE, not needed when the next page is already warm
+        self.end_of_page_pause = 0.5 if self.prefetcher else 2
         
-        # flags
-        self.current_speed = "slow"    
-        self.paused = False               
-        self.next_site_flag = False       
-        self.prev_site_flag = False       
-        self.quit_flag = False            
+        # key presses arrive here as commands, the main loop owns the state below
+        self.controls = replay if replay is not None else ControlQueue()
+        self.current_speed = "slow"
+        self.paused = False
+        self.quit_flag = False
 
 
-    def search_duckduckgo(self, query: str):
+    def search_duckduckgo(self, query: str, max_results: int = 5):
         """
         Fast search using DuckDuckGo (no CAPTCHA, privacy-focused)
         """
         try:
             print("[INFO] Using DuckDuckGo search (faster, no CAPTCHA)")
-            self.driver.get(f"https://duckduckgo.com/?q={query.replace(' ', '+')}&ia=web")
+            with instrument.span("search.navigate"):
+                self.driver.get(f"https://duckduckgo.com/?q={query.replace(' ', '+')}&ia=web")
             
             # wait for results - DuckDuckGo is much faster ngl
             wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'article h2 a')))
-            
+            with instrument.span("search.wait"):
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'article h2 a')))
             
-            results = self.driver.find_elements(By.CSS_SELECTOR, 'article h2 a')  #chrome h3 a
             
-            links = []
-            for r in results[:5]:
-                try:
-                    href = r.get_attribute('href')
-                    if href and href.startswith('http') and 'duckduckgo.com' not in href:
-                        links.append(href)
-                except Exception as e:
-                    continue
+            # every result in one script call instead of a round trip per element
+            links = extract_links(self.driver, SEARCH_ENGINES["duckduckgo"], max_results)
             
             if links:
                 print(f"[SUCCESS] Found {len(links)} valid links from DuckDuckGo")
@@ -135,29 +164,22 @@ class BrowserAgent:
             print(f"[ERROR] DuckDuckGo search failed: {e}")
             return []
     
-    def search_bing(self, query: str):
+    def search_bing(self, query: str, max_results: int = 5):
         """
         Fallback search using Bing (usually more lenient than Google)
         """
         try:
             print("[INFO] Using Bing search as fallback")
-            self.driver.get(f"https://www.bing.com/search?q={query.replace(' ', '+')}")
+            with instrument.span("search.navigate"):
+                self.driver.get(f"https://www.bing.com/search?q={query.replace(' ', '+')}")
             
            
             wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'h2 a')))
+            with instrument.span("search.wait"):
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'h2 a')))
             
           
-            results = self.driver.find_elements(By.CSS_SELECTOR, 'h2 a')
-            
-            links = []
-            for r in results[:5]:
-                try:
-                    href = r.get_attribute('href')
-                    if href and href.startswith('http') and 'bing.com' not in href and 'microsoft.com' not in href:
-                        links.append(href)
-                except Exception as e:
-                    continue
+            links = extract_links(self.driver, SEARCH_ENGINES["bing"], max_results)
             
             if links:
                 print(f"[SUCCESS] Found {len(links)} valid links from Bing")
@@ -170,28 +192,77 @@ class BrowserAgent:
             print(f"[ERROR] Bing search failed: {e}")
             return []
     
-    def search(self, query: str, max_retries: int = 1):
+    def search(self, query: str, max_retries: int = 1, max_results: int = 5):
+        """
+        Cached search - serve fresh results from the on-disk cache,
+        otherwise run the engines and store what they return
+        """
+        if self.cache is not None and not self.refresh_cache:
+            entry = self.cache.get_entry(query, max_results)
+            if entry:
+                engine, links = entry
+                print(f"[INFO] Using {len(links)} cached links")
+                self.link_engines.update(dict.fromkeys(links, engine))
+                return links
+
+        self.last_engine = None
+        links = self.search_engines(query, max_retries, max_results)
+
+        if self.cache is not None and self.last_engine:
+            self.cache.put(query, self.last_engine, links, max_results)
+        # remember which engine supplied each link for the tracker
+        self.link_engines.update(dict.fromkeys(links, self.last_engine or "demo"))
+        return links
+
+    def search_engines(self, query: str, max_retries: int = 1, max_results: int = 5):
         """
         Fast multi-engine search with fallbacks (DuckDuckGo -> Bing -> Google)
         Prioritizes speed over stealth for better user experience
         """
+        # browserless backend first, selenium path stays as the fallback
+        if self.http_search is not None:
+            print("[INFO] Using HTTP search backend")
+            order = self.search_racer.stats.ordered(list(self.http_search.engines))
+            engine, links = self.http_search.search(query, max_results, order=order)
+            if links:
+                self.last_engine = engine
+                return links
+            print("[WARNING] HTTP search found nothing, falling back to browser search")
+
+        if self.search_mode in ("race", "merge"):
+            print(f"[INFO] Racing all search engines ({self.search_mode} mode)")
+            try:
+                mode = "first" if self.search_mode == "race" else "merge"
+                links = self.search_racer.race(query, mode=mode, max_results=max_results)
+                if links:
+                    self.last_engine = self.search_racer.last_engine
+                    return links
+            except Exception as e:
+                print(f"[ERROR] Search race failed: {e}")
+            print("[WARNING] All search engines failed. Using demo links.")
+            return self.get_demo_links()
+
         # try DuckDuckGo first 
-        links = self.search_duckduckgo(query)
+        links = self.search_duckduckgo(query, max_results)
         if links:
+            self.last_engine = "duckduckgo"
             return links
         
         # try Bing as fallback
-        links = self.search_bing(query)
+        links = self.search_bing(query, max_results)
         if links:
+            self.last_engine = "bing"
             return links
         
         # last resort fam: simplified Google search (single attempt)
         print("[INFO] Using Google search")
         try:
-            self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}")
+            with instrument.span("search.navigate"):
+                self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}")
             
             # quick wait and check for CAPTCHA
-            time.sleep(2)
+            with instrument.span("pace.sleep"):
+                time.sleep(2)
             page_source = self.driver.page_source.lower()
             if "unusual traffic" in page_source or "captcha" in page_source:
                 print("[WARNING] Google CAPTCHA detected. Skipping Google search.")
@@ -199,21 +270,13 @@ class BrowserAgent:
             
             # quick result extraction
             wait = WebDriverWait(self.driver, 5)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a h3')))
-            results = self.driver.find_elements(By.CSS_SELECTOR, 'a h3')
-            
-            links = []
-            for r in results[:5]:
-                try:
-                    parent = r.find_element(By.XPATH, '..')
-                    href = parent.get_attribute('href')
-                    if href and href.startswith('http') and 'google.com' not in href:
-                        links.append(href)
-                except:
-                    continue
+            with instrument.span("search.wait"):
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a h3')))
+            links = extract_links(self.driver, SEARCH_ENGINES["google"], max_results)
             
             if links:
                 print(f"[SUCCESS] Found {len(links)} valid links from Google")
+                self.last_engine = "google"
                 return links
                 
         except Exception as e:
@@ -229,13 +292,7 @@ class BrowserAgent:
         """
         Fallback demo links for testing when search fails
         """
-        demo_links = [
-            "https://news.ycombinator.com",
-            "https://www.bbc.com/news",
-            "https://www.reddit.com",
-            "https://stackoverflow.com",
-            "https://www.wikipedia.org"
-        ]
+        demo_links = list(DEMO_LINKS)
         print(f"[INFO] Using {len(demo_links)} demo websites")
         return demo_links
     
@@ -253,58 +310,50 @@ class BrowserAgent:
         
         self.start_keyboard_listener()
         links = self.get_demo_links()
+        self.queue_links(links)
+        self.start_recording(query)
         
         # use same main loop as regular run
-        for index, link in enumerate(links, 1):
-            if self.quit_flag:
-                break
-
-            self.driver.get(link)
-            self.tracker.start_site(link)
-            scroller = Scroller(self.driver, self.current_speed)
-
-            scrolling_active = True
-            while scrolling_active:
-                status = "PAUSED" if self.paused else "SCROLLING"
-                self.dashboard.show_status(index, len(links), link, self.current_speed, status)
-
-                if self.next_site_flag:
-                    self.next_site_flag = False
-                    break
-                if self.prev_site_flag:
-                    self.prev_site_flag = False
-                    index = max(0, index - 2)
-                    break
-                if self.quit_flag:
-                    break
-
-                if self.paused:
-                    time.sleep(0.1)
-                    continue
-
-                scroller.change_speed(self.current_speed)
-                can_scroll_more = scroller.scroll_step(self.paused)
-                
-                if not can_scroll_more:
-                    self.dashboard.show_status(index, len(links), link, self.current_speed, "END OF PAGE")
-                    time.sleep(2)
-                    scrolling_active = False
-                    break
-                    
-                time.sleep(0.002)
-
-            self.tracker.end_site()
+        self.browse()
 
         self.dashboard.show_summary(self.tracker.get_summary())
+        self.report_latency()
         self.cleanup()
 
        
        
-    def run(self, query: str):
+    def queue_links(self, links):
+        """
+        hand search results to the frontier, if every link was visited
+        recently they are queued again rather than ending with nothing
+        """
+        added = self.frontier.add(links, self.link_engines, revisit=self.revisit)
+        skipped = self.frontier.skipped_visited
+        if skipped:
+            print(f"[INFO] Skipped {skipped} links visited in the last 24h (--revisit to include them)")
+        if not added and skipped:
+            print("[INFO] Nothing new to visit, revisiting these links")
+            added = self.frontier.add(links, self.link_engines, revisit=True)
+        print(f"[INFO] {added} links queued")
+        return added
+
+    def start_recording(self, query: str):
+        """
+        trace header with the links as queued (deduped, in visiting order), a
+        replay frontier has no visited index and must not filter them again,
+        plus the settings that decide how pages are opened and loaded
+        """
+        if self.recorder is not None:
+            settings = {"resident_tabs": self.resident_tabs, "prefetch_depth": self.prefetch_depth,
+                        "prefetch_memory_mb": self.prefetch_memory_mb,
+                        "block_rules": asdict(self.block_rules) if self.block_rules else None}
+            self.recorder.start(query, list(self.frontier.queue), self.current_speed, self.scroll_mode, settings)
+
+    def run(self, query: str, max_links: int = 5):
         """
         Main execution loop for browser automation
-        1. call search()
-        2. iterate through links
+        1. call search() for up to max_links results
+        2. queue them in the frontier and take links from it
         3. open site, scroll with Scroller
         4. record stats with Tracker
         5. update Dashboard
@@ -317,68 +366,351 @@ class BrowserAgent:
         print("[INFO] Starting keyboard listener...")
         print("[INFO] Launching browser...\n")
         
-        self.start_keyboard_listener()
-        links = self.search(query)
-        for index, link in enumerate(links, 1):
-            # 3a. check quit flag before opening
-            if self.quit_flag:
-                break
-
-            # 3b. open link in selenium driver
-            self.driver.get(link)
-
-            # 4. start tracking the site
-            self.tracker.start_site(link)
-
-            # 5. initialize scroller for this page
-            scroller = Scroller(self.driver, self.current_speed)
-
-            # 6. scrolling loop (step by step)
-            scrolling_active = True
-            while scrolling_active:
-                # 6a. update dashboard with current status
-                status = "PAUSED" if self.paused else "SCROLLING"
-                self.dashboard.show_status(index, len(links), link, self.current_speed, status)
-
-                # 6b. check flags for next / prev / quit
-                if self.next_site_flag:
-                    self.next_site_flag = False
-                    break
-                if self.prev_site_flag:
-                    self.prev_site_flag = False
-                    index = max(0, index - 2)  # go back one site in loop
-                    break
-                if self.quit_flag:
-                    break
+        if self.replay is not None:
+            # same links as the recording, no keyboard: commands come from the trace
+            links = self.replay.links
+        else:
+            self.start_keyboard_listener()
+            links = self.search(query, max_results=max_links)
+        self.queue_links(links)
+        self.start_recording(query)
+        self.browse()
 
-                # 6c. if paused, just wait and continue loop
-                if self.paused:
-                    time.sleep(0.1)
-                    continue
+        # 8. after all sites or quit, show final summary
+        self.dashboard.show_summary(self.tracker.get_summary())
+        self.report_latency()
+        
+        # 9. cleanup
+        self.cleanup()
 
-                # 6d. dynamically update scroller speed
-                scroller.change_speed(self.current_speed)
+    def browse(self):
+        """
+        Event-driven main loop shared by run / run_fast_demo
+        takes links from the frontier, blocks on the control queue until a
+        key command arrives or the next scroll tick is due, so a paused
+        session uses no CPU
+        """
+        history = NavigationHistory()   # back / forward stacks of visited links
+        failures = {}   # link -> browser failures on it
+        action = "next"
+        while not self.quit_flag:
+            if action == "prev":
+                entry = history.go_back() or history.current   # first page: stay
+            elif action == "next":
+                entry = history.go_forward()
+                if entry is None:
+                    link = self.frontier.pop()
+                    if link is None:
+                        break
+                    entry = history.push(link)
+            else:
+                entry = history.current     # retry after a crash
+            link = entry.url
+            total = len(history) + len(self.frontier)
 
-                # 6e. perform one scroll step (pass pause state)
-                can_scroll_more = scroller.scroll_step(self.paused)
-                
-                # 6f. if we've reached the end of the page, automatically go to next site
-                if not can_scroll_more:
-                    self.dashboard.show_status(index, len(links), link, self.current_speed, "END OF PAGE")
-                    time.sleep(2)  # Brief pause before moving to next site
-                    scrolling_active = False
+            try:
+                if self.memory is not None and self.tracker.current is None and self.tracker.visits:
+                    self.govern_memory()  # between sites only
+                    if self.quit_flag:
+                        break
+                action = self.visit_site(history.index, total, entry, history.upcoming())
+                if action in ("next", "prev") and self.tabs is not None:
+                    self.tabs.keep(entry)   # stays open for going back
+                    self.tabs.trim()        # at most --tabs pages, counting this one
+            except DRIVER_ERRORS as e:
+                # crash / hang: record it, restart the browser, resume at this link
+                reason = self.supervisor.failure_reason(e)
+                print(f"[WARNING] Browser failed on {link} ({reason}), restarting")
+                self.tracker.mark_failure(reason)
+                self.tracker.end_site()
+                for hook in self.session_hooks:
+                    hook.end_visit(None)
+                failures[link] = failures.get(link, 0) + 1
+                if not self.recover():
                     break
-                    
-                # Small delay to prevent excessive CPU usage
-                time.sleep(0.002)
+                action = "next" if failures[link] >= self.MAX_SITE_ATTEMPTS else None
+
+    def visit_site(self, index, total, entry, upcoming):
+        """
+        load one history entry and scroll it, returns "next" / "prev" / "quit"
+        upcoming: links already known to come after this one (for prefetching)
+        """
+        link = entry.url
+        # 1. start tracking, open link (resident tab, prefetched tab or a fresh load)
+        visit = self.tracker.start_site(link, engine=self.frontier.engines.get(link))
+        for hook in self.session_hooks:
+            hook.begin_visit(link)
+        resumed = self.open_entry(entry)
+        self.tracker.mark_loaded()
+        self.frontier.mark_visited(link)
+        if self.prefetcher is not None:
+            with self.supervisor.guard("prefetch"):
+                wanted = max(0, self.prefetcher.depth + 1 - len(upcoming))
+                self.prefetcher.prefetch(upcoming + self.frontier.peek(wanted))
+        extractor = (PageExtractor.for_visit(self.content, visit, every=self.extract_every)
+                     if self.content is not None else None)
+        scroller = Scroller(self.driver, self.current_speed, self.scroll_mode, extractor=extractor,
+                            **self.scroll_timing)
+        if resumed:
+            with self.supervisor.guard("scroll"):
+                scroller.rearm(entry.position)  # the tab kept its scroll offset
+        elif entry.position:
+            with self.supervisor.guard("scroll"):
+                scroller.jump_to(entry.position)
+        if self.paused:
+            # paused on the last page (or its END OF PAGE wait): this one starts paused
+            self.tracker.pause()
+            scroller.pause()
+        self.show_status(index, total, link)
 
-            # 7. end tracking this site
-            self.tracker.end_site()
+        # 2. scroll until a command moves us on or the page ends
+        action = None
+        while action is None:
+            # paused -> wait for the next command only
+            timeout = None if self.paused else scroller.tick_interval()
+            with instrument.span("pace.paused" if self.paused else "pace.wait"):
+                command = self.controls.wait(timeout)
+
+            if command is not None:
+                for hook in self.session_hooks:
+                    hook.command(command)
+                action = self.handle_command(command, scroller)
+                self.show_status(index, total, link)
+                continue
+
+            with self.supervisor.guard("scroll"):
+                more = scroller.scroll_step(wait=False)
+            for hook in self.session_hooks:
+                hook.step(scroller.position)
+            if more:
+                self.tracker.mark_scroll(scroller.moved)
+            else:
+                self.tracker.mark_end()
+                action = self.end_of_page(scroller, index, total, link)
+
+        # 3. end tracking this site
+        entry.position = scroller.position
+        if self.tabs is not None and action in ("next", "prev"):
+            # the page may stay resident, its rAF loop must not keep scrolling it
+            with self.supervisor.guard("scroll"):
+                scroller.stop_raf()
+        if extractor is not None:
+            with self.supervisor.guard("extract"):
+                extractor.finish(self.driver)
+        if self.session_hooks:
+            with self.supervisor.guard("snapshot"):
+                for hook in self.session_hooks:
+                    hook.end_visit(self.driver)
+        if self.blocker is not None:
+            self.tracker.mark_requests(self.blocker.take_counts())
+        self.tracker.end_site()
+        return action
+
+    def end_of_page(self, scroller, index, total, link):
+        """
+        brief pause at the bottom before moving on, returns "next" / "prev" / "quit"
+        only those commands (or the pause running out) leave the page, speed
+        keys apply; while paused the wait lasts until resumed and starts over
+        """
+        clock = scroller.controller.clock
+        deadline = clock() + self.end_of_page_pause
+        while True:
+            self.show_status(index, total, link, "PAUSED" if self.paused else "END OF PAGE")
+            command = self.controls.wait(None if self.paused else max(0.0, deadline - clock()))
+            if command is None:
+                return "next"
+            for hook in self.session_hooks:
+                hook.command(command)
+            was_paused = self.paused
+            action = self.handle_command(command, scroller)
+            if action is not None:
+                return action
+            if was_paused and not self.paused:
+                deadline = clock() + self.end_of_page_pause
+
+    def open_entry(self, entry):
+        """
+        show a history entry, returns True when its resident tab was switched
+        to (page and scroll offset intact) instead of loading it
+        """
+        link = entry.url
+        if self.tabs is not None:
+            if self.tabs.restore(entry):
+                self.rebind_blocker()
+                return True
+            # the page we leave is resident, it must keep its tab
+            keep_current = self.tabs.holds(self.driver.current_window_handle)
+        else:
+            keep_current = False
+
+        if self.prefetcher is not None and self.prefetcher.activate(link, close_previous=not keep_current):
+            self.switch_blocker()
+        else:
+            if keep_current:
+                self.tabs.open_blank()
+                self.rebind_blocker()
+            if not self.supervisor.load(self.replay.url_for(link) if self.replay else link):
+                print(f"[WARNING] {link} still loading after {self.supervisor.page_load_timeout}s, scrolling anyway")
+                self.tracker.mark_failure("page_load_timeout")
+        return False
+
+    def rebind_blocker(self):
+        """
+        request blocking follows the active tab after a tab switch
+        """
+        if self.blocker is not None:
+            self.blocker.close()
+            self.blocker = attach_blocker(self.driver, self.block_rules)
+
+    def govern_memory(self):
+        """
+        recycle the tab (+ clear caches) or restart the browser when the
+        memory governor says the session is over budget
+        """
+        action = self.memory.check()
+        if action is None:
+            return
+        sample = self.memory.last_sample
+        print(f"[INFO] Memory over budget ({sample}), {action.replace('_', ' ')}")
+        self.tracker.log_event(f"memory_{action}", **sample)
+
+        if action == "restart":
+            # planned restart: does not use up the crash restart budget
+            if not self.recover(counted=False):
+                print("[ERROR] No browser after the memory restart, stopping the session")
+                self.quit_flag = True
+            return
+
+        with self.supervisor.guard("recycle"):
+            # the page just left is usually resident and still the active tab:
+            # move to a fresh tab first, then close every resident one (they
+            # reload when revisited)
+            recycle_tab(self.driver)
+            if self.tabs is not None:
+                self.tabs.trim(0)
+            clear_caches(self.driver)
+        # the blocker was bound to the closed tab
+        self.rebind_blocker()
+
+    def recover(self, counted: bool = True):
+        """
+        replace a crashed / hung browser and rebuild everything bound to it
+        returns False when the supervisor gave up
+        counted: False for memory restarts, they have their own budget
+        """
+        supervisor = self.supervisor
+        if counted and supervisor.restarts >= supervisor.max_restarts:
+            # give up before tearing down blocker / prefetcher / lease of the old browser
+            print(f"[ERROR] Browser restarted {supervisor.restarts} times, giving up")
+            return False
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self.blocker is not None:
+            self.blocker.close()
+            self.blocker = None
+        # a warm browser from the daemon is not ours to restart
+        if self.daemon_address:
+            release_browser(self.daemon_address)
+            self.daemon_address = None
+
+        try:
+            self.driver = supervisor.restart(counted)
+        except Exception as e:
+            print(f"[ERROR] Could not restart the browser: {e}")
+            return False
+        if counted:
+            print(f"[INFO] Browser restarted ({supervisor.restarts}/{supervisor.max_restarts})")
+        else:
+            print(f"[INFO] Browser restarted ({self.memory.restarts}/{self.memory.max_restarts} for memory)")
+
+        self.search_racer.driver = self.driver
+        if self.memory is not None:
+            self.memory.reset(self.driver)
+        if self.tabs is not None:
+            self.tabs.reset(self.driver)
+        if self.block_rules:
+            self.blocker = attach_blocker(self.driver, self.block_rules)
+        if self.prefetcher is not None:
+            self.prefetcher = TabPrefetcher(self.driver, self.prefetcher.depth, self.prefetcher.memory_limit_mb,
+                                            self.block_rules if self.blocker else None)
+        return True
+
+    def switch_blocker(self):
+        """
+        after switching to a prefetched tab, count requests with that tab's blocker
+        """
+        blocker = self.prefetcher.take_blocker(self.driver.current_window_handle)
+        if blocker is not None:
+            if self.blocker is not None:
+                self.blocker.close()
+            self.blocker = blocker
+
+    def handle_command(self, command, scroller=None):
+        """
+        apply one control command, returns "next" / "prev" / "quit" when the
+        current site should be left, otherwise None
+        """
+        self.controls.handled(command)
+
+        if command.name == "speed":
+            self.current_speed = command.value
+            if scroller is not None:
+                scroller.change_speed(command.value)
+        elif command.name == "pause":
+            self.paused = not self.paused
+            if self.paused:
+                self.tracker.pause()
+                if scroller is not None:
+                    scroller.pause()
+            else:
+                self.tracker.resume()
+                if scroller is not None:
+                    scroller.resume()
+        elif command.name in ("next", "prev"):
+            return command.name
+        elif command.name == "quit":
+            self.quit_flag = True
+            return "quit"
+        return None
+
+    def show_status(self, index, total, link, status=None):
+        if status is None:
+            status = "PAUSED" if self.paused else "SCROLLING"
+        self.dashboard.show_status(index, total, link, self.current_speed, status)
+
+    def report_latency(self):
+        """
+        print how quickly key commands were acted on
+        """
+        count, median_ms, max_ms = self.controls.latency_summary()
+        if count:
+            print(f"[INFO] Key response: {count} commands, median {median_ms:.1f}ms, max {max_ms:.1f}ms")
+
+    def run_pool(self, query: str, workers: int = 4):
+        """
+        Pool mode - visit links in parallel with N headless workers
+        only the q key is honoured, workers always scroll at fast speed
+        """
+        print("\n" + "=" * 50)
+        print("             initializing pool")
+        print("=" * 50)
+        print(f"[INFO] Search query: '{query}'")
+        print(f"[INFO] Starting {workers} headless workers...\n")
+
+        self.start_keyboard_listener()
+        links = self.search(query, max_results=max(5, workers * 5))
+        self.queue_links(links)
+        links = self.frontier.drain()
+        # pool links count as visited once handed to the workers
+        for link in links:
+            self.frontier.mark_visited(link)
+
+        self.pool = BrowserPool(self.tracker, self.dashboard, workers=workers,
+                                speed="fast", scroll_mode=self.scroll_mode, block_rules=self.block_rules,
+                                content=self.content, extract_every=self.extract_every)
+        self.pool.run(links, controls=self.controls, link_engines=self.frontier.engines)
 
-        # 8. after all sites or quit, show final summary
         self.dashboard.show_summary(self.tracker.get_summary())
-        
-        # 9. cleanup
         self.cleanup()
 
     def start_keyboard_listener(self):
@@ -390,23 +722,13 @@ class BrowserAgent:
         - b → previous site
         - q → quit
         """
+        import keyboard    # type: ignore # capture key presses, only interactive runs need it
+
         def on_key_event(e):
             # only process key down events to avoid double triggers
             if e.event_type == keyboard.KEY_DOWN:
-                if e.name == "1":
-                    self.current_speed = "slow"
-                elif e.name == "2":
-                    self.current_speed = "medium"
-                elif e.name == "3":
-                    self.current_speed = "fast"
-                elif e.name == "p":
-                    self.paused = not self.paused
-                elif e.name == "n":
-                    self.next_site_flag = True
-                elif e.name == "b":
-                    self.prev_site_flag = True
-                elif e.name == "q":
-                    self.quit_flag = True
+                # main loop picks the command up from the queue
+                self.controls.put_key(e.name)
 
         # use hook instead of on_press for better reliability
         listener_thread = threading.Thread(target=lambda: keyboard.hook(on_key_event), daemon=True) #.on_press(on_key_event)
@@ -415,16 +737,67 @@ class BrowserAgent:
     def cleanup(self):
         """
         Clean up browser and stop dashboard
+        safe to call again (main calls it on Ctrl+C / errors too)
         """
+        if getattr(self, 'cleaned_up', False):
+            return
+        self.cleaned_up = True
+        try:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        except Exception as e:
+            print(f"[WARNING] Error shutting down pool: {e}")
+
+        if getattr(self, 'prefetcher', None) is not None:
+            if self.prefetcher.hits or self.prefetcher.misses:
+                print(f"[INFO] Prefetched tabs used: {self.prefetcher.hits}, "
+                      f"loaded normally: {self.prefetcher.misses}")
+            self.prefetcher.close()
+
+        if getattr(self, 'blocker', None) is not None:
+            if self.tracker.total_blocked:
+                print(f"[INFO] Blocked {self.tracker.total_blocked} requests, "
+                      f"loaded {self.tracker.total_bytes / 1e6:.1f}MB")
+            self.blocker.close()
+
+        if getattr(self, 'recorder', None) is not None:
+            print(f"[INFO] Session trace: {self.recorder.directory}")
+            self.recorder.close()
+
+        if getattr(self, 'content', None) is not None:
+            print(f"[INFO] Page content: {self.content.chunks} chunks in {self.content.path}")
+            self.content.close()
+
+        if getattr(self, 'supervisor', None) is not None:
+            self.supervisor.close()
+        if getattr(self, 'http_search', None) is not None:
+            self.http_search.close()
+        if getattr(self, 'frontier', None) is not None:
+            self.frontier.close()
+        if getattr(self, 'cache', None) is not None:
+            self.cache.close()
+
         try:
             if hasattr(self, 'driver') and self.driver:
                 self.driver.quit()
-                print("[INFO] Browser closed successfully")
+                if getattr(self, 'daemon_address', None):
+                    print("[INFO] Detached from warm browser")
+                else:
+                    print("[INFO] Browser closed successfully")
         except Exception as e:
             print(f"[WARNING] Error closing browser: {e}")
+
+        # hand the warm browser back, daemon resets cookies / tabs for the next session
+        if getattr(self, 'daemon_address', None):
+            release_browser(self.daemon_address)
+            self.daemon_address = None
         
         try:
             if hasattr(self, 'dashboard') and self.dashboard and self.dashboard.live:
                 self.dashboard.live.stop()
         except Exception as e:
             print(f"[WARNING] Error stopping dashboard: {e}")
+
+        if getattr(self, 'tracker', None) is not None:
+            self.tracker.close()
@@ -0,0 +1,366 @@
+# ==============================
+# async_agent.py
+# asyncio variant of the agent:
+#   - navigation, scroll ticks and commands go over the devtools websocket
+#   - load / network idle / page height changes arrive as events
+#   - search runs off the loop (http backend in an executor)
+#   - several browsers can be driven from one event loop
+# ==============================
+
+import asyncio
+import json
+
+from agent.browser import create_driver
+from agent.cache import SearchCache
+from agent.cdp import CdpSession
+from agent.controls import KEY_COMMANDS, Command
+from agent.dashboard import Dashboard
+from agent.http_search import HttpSearchBackend
+from agent.page_watch import STEP_SCRIPT, WATCH_SCRIPT, evaluate_expression
+from agent.paths import state_file
+from agent.scroller import RateController, speed_rate
+from agent.search import DEMO_LINKS
+from agent.tracker import SessionTracker
+
+
+class AsyncBrowserAgent:
+    """
+    asyncio-native agent driving one browser over devtools
+    Responsibilities:
+    - navigate and wait on load events instead of blocking webdriver calls
+    - scroll with Runtime.evaluate ticks
+    - react to key commands and page watcher events (height changed / done)
+    """
+    # how long the page watcher waits at the bottom for lazy content
+    LAZY_LOAD_WAIT = 1.5
+    # infinite feeds are done after growing this many times
+    MAX_EXTENSIONS = 50
+
+    def __init__(self, driver, cdp, tracker=None, dashboard=None, name: str = "1"):
+        self.driver = driver
+        self.cdp = cdp
+        self.tracker = tracker or SessionTracker()
+        self.dashboard = dashboard
+        self.name = name
+
+        self.loop = None
+        self.commands = asyncio.Queue()
+        self.loaded = asyncio.Event()
+        self.network_idle = asyncio.Event()
+        self.height_changed = asyncio.Event()
+        self.page_done = asyncio.Event()
+        self.at_bottom = False
+        self.page_height = 0
+        self.position = 0
+        self.moved = 0
+        self.link_engines = {}
+
+        self.current_speed = "slow"
+        self.paused = False
+        self.quit_flag = False
+
+        # shown in multi-browser mode
+        self.url = None
+        self.status = "IDLE"
+        self.visited = 0
+
+    @classmethod
+    async def create(cls, headless: bool = False, **kwargs):
+        """
+        launch chrome off the loop, then attach the devtools session
+        """
+        loop = asyncio.get_running_loop()
+        driver = await loop.run_in_executor(None, create_driver, headless)
+        cdp = await loop.run_in_executor(None, CdpSession.for_driver, driver)
+        agent = cls(driver, cdp, **kwargs)
+        await agent.setup()
+        return agent
+
+    async def setup(self):
+        """
+        enable the domains we listen to and bridge their events into the loop
+        """
+        self.loop = asyncio.get_running_loop()
+
+        self.cdp.on("Page.loadEventFired", lambda params: self.from_thread(self.loaded.set))
+        self.cdp.on("Page.lifecycleEvent", self.on_lifecycle)
+        self.cdp.on("Runtime.bindingCalled", self.on_binding)
+
+        await self.cdp.send_async("Page.enable")
+        await self.cdp.send_async("Runtime.enable")
+        await self.cdp.send_async("Page.setLifecycleEventsEnabled", {"enabled": True})
+        # the page watcher pushes its events through this binding
+        await self.cdp.send_async("Runtime.addBinding", {"name": "assaPageEvent"})
+
+    def from_thread(self, callback, *args):
+        """
+        devtools events arrive on the reader thread, hop onto the loop
+        """
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def on_lifecycle(self, params):
+        if params.get("name") == "networkIdle":
+            self.from_thread(self.network_idle.set)
+
+    def on_binding(self, params):
+        if params.get("name") == "assaPageEvent":
+            self.from_thread(self.on_page_event, json.loads(params.get("payload") or "{}"))
+
+    def on_page_event(self, event):
+        self.page_height = max(self.page_height, event.get("height") or 0)
+        if event.get("type") == "height":
+            self.height_changed.set()
+        elif event.get("type") == "done":
+            self.page_done.set()
+
+    def put_key(self, key: str):
+        """
+        thread-safe entry point for the keyboard listener
+        """
+        if key in KEY_COMMANDS:
+            self.from_thread(self.commands.put_nowait, Command(*KEY_COMMANDS[key]))
+
+    async def navigate(self, url: str, timeout: float = 30):
+        """
+        navigate and wait for the load event (not for the webdriver round trip)
+        """
+        self.loaded.clear()
+        self.network_idle.clear()
+        self.height_changed.clear()
+        self.page_done.clear()
+        self.at_bottom = False
+        self.page_height = 0
+        self.position = 0
+
+        await self.cdp.send_async("Page.navigate", {"url": url})
+        try:
+            await asyncio.wait_for(self.loaded.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARNING] {url} did not finish loading in {timeout}s, scrolling anyway")
+
+    async def evaluate(self, script: str, *args):
+        result = await self.cdp.send_async("Runtime.evaluate", {
+            "expression": evaluate_expression(script, *args),
+            "returnByValue": True,
+        })
+        return result.get("result", {}).get("value")
+
+    async def scroll_step(self, pixels: int):
+        """
+        one scroll tick over devtools, returns True if more scrolling is possible
+        """
+        value = await self.evaluate(STEP_SCRIPT, int(pixels))
+        if value is None:
+            # new document: install the watcher, or retry next tick if there is no body yet
+            await self.evaluate(WATCH_SCRIPT, int(self.LAZY_LOAD_WAIT * 1000), self.MAX_EXTENSIONS)
+            return True
+        position, height, done, self.at_bottom = value
+        self.moved = max(0, position - self.position)
+        self.position = position
+        self.page_height = max(self.page_height, height)
+        return not done
+
+    async def wait_for_more_content(self):
+        """
+        parked at the bottom: sleep until the watcher pushes "height" or "done"
+        returns False once the page is truly done
+        """
+        self.height_changed.clear()
+        if self.page_done.is_set():
+            return False
+        waiters = [asyncio.ensure_future(self.height_changed.wait()),
+                   asyncio.ensure_future(self.page_done.wait())]
+        # the timeout only guards against a lost binding call
+        await asyncio.wait(waiters, timeout=self.LAZY_LOAD_WAIT * 2, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+        return not self.page_done.is_set()
+
+    def show_status(self, index, total, link, status=None):
+        self.status = status or ("PAUSED" if self.paused else "SCROLLING")
+        if self.dashboard is not None:
+            self.dashboard.show_status(index, total, link, self.current_speed, self.status)
+
+    def handle_command(self, command):
+        """
+        same command semantics as BrowserAgent.handle_command
+        """
+        if command.name == "speed":
+            self.current_speed = command.value
+        elif command.name == "pause":
+            self.paused = not self.paused
+        elif command.name in ("next", "prev"):
+            return command.name
+        elif command.name == "quit":
+            self.quit_flag = True
+            return "quit"
+        return None
+
+    async def browse(self, links):
+        """
+        coroutine version of BrowserAgent.browse
+        """
+        position = 0
+        while 0 <= position < len(links) and not self.quit_flag:
+            index, link = position + 1, links[position]
+            self.url = link
+
+            visit = self.tracker.new_visit(link, self.link_engines.get(link))
+            rate = RateController(speed_rate(self.current_speed))
+            self.show_status(index, len(links), link, "LOADING")
+            await self.navigate(link)
+            self.tracker.mark_loaded(visit)
+            self.show_status(index, len(links), link)
+
+            action = None
+            while action is None:
+                try:
+                    # paused -> wait for the next command only
+                    command = await asyncio.wait_for(self.commands.get(), None if self.paused else rate.interval())
+                except asyncio.TimeoutError:
+                    command = None
+
+                if command is not None:
+                    action = self.handle_command(command)
+                    if command.name == "speed":
+                        rate.set_target(speed_rate(self.current_speed))
+                    elif command.name == "pause" and self.paused:
+                        self.tracker.pause(visit)
+                    elif command.name == "pause":
+                        self.tracker.resume(visit)
+                        rate.reset()
+                    self.show_status(index, len(links), link)
+                    continue
+
+                pixels = rate.next_pixels()
+                if pixels == 0:
+                    continue
+                if not await self.scroll_step(pixels):
+                    self.tracker.mark_end(visit)
+                    self.show_status(index, len(links), link, "END OF PAGE")
+                    action = "next"
+                    continue
+
+                self.tracker.mark_scroll(self.moved, visit)
+                if self.at_bottom:
+                    self.show_status(index, len(links), link, "WAITING FOR CONTENT")
+                    if not await self.wait_for_more_content():
+                        self.tracker.mark_end(visit)
+                        action = "next"
+                    else:
+                        rate.reset()  # do not make up for the time spent waiting
+                        self.show_status(index, len(links), link)
+
+            self.tracker.end_site(visit)
+            self.visited += 1
+
+            if action == "prev":
+                position = max(0, position - 1)
+            elif action == "next":
+                position += 1
+
+        self.url = None
+        self.status = "DONE"
+
+    async def close(self):
+        self.cdp.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.driver.quit)
+
+
+async def search_links(query: str, max_results: int = 5, use_cache: bool = True):
+    """
+    cached http search run in an executor, demo links when nothing is found
+    returns (engine, links)
+    """
+    loop = asyncio.get_running_loop()
+    cache = SearchCache(state_file("search_cache.sqlite")) if use_cache else None
+    try:
+        if cache is not None:
+            entry = cache.get_entry(query, max_results)
+            if entry:
+                print(f"[INFO] Using {len(entry[1])} cached links")
+                return entry
+
+        backend = HttpSearchBackend()
+        try:
+            engine, links = await loop.run_in_executor(None, backend.search, query, max_results)
+        finally:
+            backend.close()
+
+        if links:
+            if cache is not None:
+                cache.put(query, engine, links, max_results)
+            return engine, links
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print("[WARNING] All search engines failed. Using demo links.")
+    return "demo", list(DEMO_LINKS)
+
+
+async def refresh_dashboard(dashboard, agents, done: asyncio.Event):
+    """
+    multi-browser mode: one dashboard row per browser
+    """
+    while not done.is_set():
+        rows = [(a.name, a.url, a.status, a.visited, 0) for a in agents]
+        dashboard.show_workers(rows, 0)
+        try:
+            await asyncio.wait_for(done.wait(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_keyboard_listener(agents):
+    """
+    keyboard hook thread, every key press is fanned out to all agents
+    """
+    import keyboard  # type: ignore
+
+    def on_key_event(e):
+        if e.event_type == keyboard.KEY_DOWN:
+            for agent in agents:
+                agent.put_key(e.name)
+
+    keyboard.hook(on_key_event)
+
+
+async def run_agents(query: str, browsers: int = 1, headless: bool = False, interactive: bool = True,
+                     speed="slow", max_links: int = 5, use_cache: bool = True):
+    """
+    search once, split the links across N browsers driven from this loop
+    speed: starting speed of every browser (preset name or px/sec)
+    max_links: links per browser
+    """
+    tracker = SessionTracker()
+    dashboard = Dashboard()
+    count = max(1, browsers)
+
+    # browsers launch while the search runs
+    search = asyncio.ensure_future(search_links(query, max_results=max_links * count, use_cache=use_cache))
+    agents = await asyncio.gather(*(
+        AsyncBrowserAgent.create(headless=headless, tracker=tracker,
+                                 dashboard=dashboard if count == 1 else None, name=str(i + 1))
+        for i in range(count)
+    ))
+    engine, links = await search
+    for agent in agents:
+        agent.link_engines = dict.fromkeys(links, engine)
+        agent.current_speed = speed
+
+    if interactive:
+        start_keyboard_listener(agents)
+
+    done = asyncio.Event()
+    refresher = asyncio.ensure_future(refresh_dashboard(dashboard, agents, done)) if count > 1 else None
+    try:
+        await asyncio.gather(*(agent.browse(links[i::count]) for i, agent in enumerate(agents)))
+    finally:
+        done.set()
+        if refresher is not None:
+            await refresher
+        await asyncio.gather(*(agent.close() for agent in agents), return_exceptions=True)
+
+    dashboard.show_summary(tracker.get_summary())
+    tracker.close()
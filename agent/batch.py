@@ -0,0 +1,213 @@
+# ==============================
+# batch.py
+# unattended batch mode for servers:
+#   - many queries from a file or stdin
+#   - headless pool, no keyboard hook, no live dashboard
+#   - one JSON line per visit on stdout (or a file), status on stderr
+#   - exit status: 0 ok, 1 some queries / links failed, 2 nothing visited,
+#     130 interrupted
+#
+# usage:
+#   python -m agent.batch queries.txt --workers 8 --out results.jsonl
+#   cat queries.txt | python main.py --batch -
+# ==============================
+
+import argparse
+import contextlib
+import sys
+import time
+
+from agent.cache import SearchCache
+from agent.extract import ContentWriter, content_path
+from agent.frontier import Frontier, VisitedIndex, canonicalize
+from agent.http_search import HttpSearchBackend
+from agent.paths import state_file
+from agent.tracker import SessionTracker
+
+
+def read_queries(source: str):
+    """
+    one query per line from a file ("-" = stdin), blank lines and # comments skipped
+    """
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class BatchRunner:
+    """
+    runs many queries without a human in front of it
+    Responsibilities:
+    - search every query (cache -> http backend -> headless browser race)
+    - visit all links with one headless pool, deduped by the frontier
+    - stream visit records and report visits per minute
+    """
+
+    def __init__(self, out=None, workers: int = 4, max_links: int = 5, max_site_time: float = 30,
+                 use_cache: bool = True, revisit: bool = False, block_rules=None, extract_every: int = 0):
+        self.out = out or sys.stdout
+        self.workers = workers
+        self.max_links = max_links
+        self.max_site_time = max_site_time
+        self.revisit = revisit
+        self.block_rules = block_rules
+        self.extract_every = extract_every   # page content every N steps, 0 = off
+
+        self.cache = SearchCache(state_file("search_cache.sqlite")) if use_cache else None
+        self.http_search = HttpSearchBackend()
+        self.search_driver = None   # headless browser, only launched if http search fails
+        self.frontier = Frontier(VisitedIndex(state_file("visited.sqlite")))
+        self.failed_queries = []
+
+    def search(self, query: str):
+        """
+        (engine, links) for one query, (None, []) when every backend failed
+        """
+        if self.cache is not None:
+            entry = self.cache.get_entry(query, self.max_links)
+            if entry:
+                return entry
+
+        engine, links = self.http_search.search(query, self.max_links)
+        if not links:
+            engine, links = self.browser_search(query)
+        if links and self.cache is not None:
+            self.cache.put(query, engine, links, self.max_links)
+        return engine, links
+
+    def browser_search(self, query: str):
+        from agent.browser import create_driver
+        from agent.search import SearchRacer
+
+        try:
+            if self.search_driver is None:
+                self.search_driver = create_driver(headless=True)
+            racer = SearchRacer(self.search_driver)
+            links = racer.race(query, max_results=self.max_links)
+            return racer.last_engine, links
+        except Exception as e:
+            print(f"[WARNING] Browser search failed for '{query}': {e}", file=sys.stderr)
+            return None, []
+
+    def collect(self, queries):
+        """
+        search all queries and queue their links, returns {canonical url: query}
+        """
+        link_queries = {}
+        for query in queries:
+            engine, links = self.search(query)
+            if not links:
+                print(f"[WARNING] No results for '{query}'", file=sys.stderr)
+                self.failed_queries.append(query)
+                continue
+            self.frontier.add(links, dict.fromkeys(links, engine), revisit=self.revisit)
+            for link in links:
+                link_queries.setdefault(canonicalize(link), query)
+            print(f"[INFO] '{query}': {len(links)} links from {engine}", file=sys.stderr)
+        return link_queries
+
+    def run(self, queries):
+        """
+        search + visit everything, returns the process exit status
+        """
+        # selenium / rich load only once there is something to visit
+        from agent.dashboard import Dashboard
+        from agent.pool import BrowserPool
+
+        start = time.monotonic()
+        link_queries = self.collect(queries)
+        links = self.frontier.drain()
+        for link in links:
+            self.frontier.mark_visited(link)
+        print(f"[INFO] {len(links)} links to visit from {len(queries)} queries "
+              f"({self.frontier.skipped_visited} visited recently)", file=sys.stderr)
+
+        tracker = SessionTracker(sink=self.out)
+        content = ContentWriter(content_path(tracker.path)) if self.extract_every else None
+        pool = BrowserPool(tracker, Dashboard(headless=True, stream=sys.stderr), workers=self.workers,
+                           speed="fast", headless=True, max_site_time=self.max_site_time,
+                           block_rules=self.block_rules, content=content, extract_every=self.extract_every)
+        interrupted = False
+        try:
+            if links:
+                pool.run(links, link_engines=self.frontier.engines, link_queries=link_queries)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("[INFO] Interrupted, stopping workers", file=sys.stderr)
+        finally:
+            pool.shutdown()
+            tracker.close()
+            if content is not None:
+                content.close()
+                print(f"[INFO] Page content: {content.chunks} chunks in {content.path}", file=sys.stderr)
+            self.close()
+
+        elapsed = time.monotonic() - start
+        # failed attempts are records too, they are not visits
+        visited = tracker.visits - tracker.failures
+        rate = visited / elapsed * 60 if elapsed else 0.0
+        print(f"[INFO] {visited} visits in {elapsed:.1f}s ({rate:.1f} visits/min), "
+              f"{len(pool.failed)} links failed, {len(self.failed_queries)} queries without results",
+              file=sys.stderr)
+
+        if interrupted:
+            return 130
+        if not visited:
+            return 2
+        return 1 if pool.failed or self.failed_queries else 0
+
+    def close(self):
+        self.http_search.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.frontier.close()
+        if self.search_driver is not None:
+            try:
+                self.search_driver.quit()
+            except Exception:
+                pass
+            self.search_driver = None
+
+
+def run_batch(source: str, out_path: str = None, **kwargs):
+    """
+    read queries from source, write visit records to out_path (default stdout)
+    """
+    queries = read_queries(source)
+    if not queries:
+        print("[ERROR] No queries to run", file=sys.stderr)
+        return 2
+
+    out = open(out_path, "a", encoding="utf-8") if out_path else sys.stdout
+    try:
+        # stray prints (pool warnings, ...) go to stderr, stdout only carries records
+        with contextlib.redirect_stdout(sys.stderr):
+            return BatchRunner(out=out, **kwargs).run(queries)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="assa unattended batch mode")
+    parser.add_argument("queries", help="file with one query per line, - for stdin")
+    parser.add_argument("--out", help="append visit records here instead of stdout")
+    parser.add_argument("--workers", type=int, default=4, help="headless browsers")
+    parser.add_argument("--links", type=int, default=5, help="links per query")
+    parser.add_argument("--max-site-time", type=float, default=30, help="seconds per site, 0 = until the end")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the search cache")
+    parser.add_argument("--revisit", action="store_true", help="include pages visited in the last 24h")
+    parser.add_argument("--extract", type=int, default=0, metavar="N",
+                        help="save page text / headings / links every N scroll steps")
+    args = parser.parse_args(argv)
+
+    return run_batch(args.queries, args.out, workers=args.workers, max_links=args.links,
+                     max_site_time=args.max_site_time, use_cache=not args.no_cache, revisit=args.revisit,
+                     extract_every=args.extract)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# ==============================
+# blocker.py
+# request interception over the devtools Fetch domain:
+#   - url patterns (ad / tracker hosts), resource types, iframes,
+#     third-party scripts
+#   - per-page byte budget, past it only the main document still loads
+#   - blocked / allowed counts per page for the session records
+# ==============================
+
+import threading
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from urllib.parse import urlsplit
+
+from agent.cdp import CdpError, CdpSession, debugger_address, devtools_json
+
+
+# ad, analytics and tracker hosts
+DEFAULT_BLOCK_PATTERNS = [
+    "*doubleclick.net/*",
+    "*googlesyndication.com/*",
+    "*googletagmanager.com/*",
+    "*google-analytics.com/*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com/*",
+    "*facebook.net/*",
+    "*scorecardresearch.com/*",
+    "*taboola.com/*",
+    "*outbrain.com/*",
+    "*criteo.com/*",
+    "*hotjar.com/*",
+]
+
+# devtools resource types, none of them are needed to scroll and read a page
+DEFAULT_BLOCK_TYPES = ["Image", "Media", "Font"]
+
+
+@dataclass
+class BlockRules:
+    """
+    what to block, byte_budget 0 means no budget
+    """
+    url_patterns: list = field(default_factory=lambda: list(DEFAULT_BLOCK_PATTERNS))
+    resource_types: list = field(default_factory=lambda: list(DEFAULT_BLOCK_TYPES))
+    block_iframes: bool = True
+    block_third_party_scripts: bool = False
+    byte_budget: int = 0
+
+    def fetch_patterns(self):
+        """
+        Fetch.enable patterns: only requests we may block pause in the browser
+        """
+        patterns = [{"urlPattern": pattern} for pattern in self.url_patterns]
+        patterns += [{"resourceType": kind} for kind in self.resource_types]
+        if self.block_iframes or self.block_third_party_scripts:
+            # the main document tells us which site is first-party
+            patterns.append({"resourceType": "Document"})
+        if self.block_third_party_scripts:
+            patterns.append({"resourceType": "Script"})
+        return patterns
+
+
+def site_of(url: str):
+    """
+    last two host labels, enough to tell a site's own cdn from third parties
+    """
+    host = urlsplit(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+class RequestBlocker:
+    """
+    intercepts the requests of one page target
+    Responsibilities:
+    - answer Fetch.requestPaused with fail / continue from the rules
+    - count allowed requests / bytes from Network.loadingFinished
+    - switch to "block everything but the page" once the byte budget is spent
+    """
+
+    def __init__(self, cdp, target_id: str, rules: BlockRules):
+        self.cdp = cdp
+        self.target_id = target_id   # == main frame id
+        self.rules = rules
+        self.lock = threading.Lock()
+        self.page_site = None
+        self.reset_counts()
+
+        cdp.on("Fetch.requestPaused", self.on_paused)
+        cdp.on("Network.loadingFinished", self.on_finished)
+        # small buffer: we only want sizes, not response bodies kept in memory
+        cdp.send("Network.enable", {"maxTotalBufferSize": 1024 * 1024, "maxResourceBufferSize": 1024})
+        cdp.send("Fetch.enable", {"patterns": rules.fetch_patterns()})
+
+    @classmethod
+    def for_driver(cls, driver, rules: BlockRules):
+        """
+        block on the driver's current window
+        """
+        return cls(CdpSession.for_driver(driver), driver.current_window_handle, rules)
+
+    @classmethod
+    def for_target(cls, address: str, target_id: str, rules: BlockRules):
+        """
+        block on another tab (eg a prefetch tab before it navigates)
+        """
+        for target in devtools_json(address, "/json/list"):
+            if target.get("id") == target_id:
+                return cls(CdpSession(target["webSocketDebuggerUrl"]), target_id, rules)
+        raise CdpError(f"No devtools target {target_id}")
+
+    def reset_counts(self):
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        self.budget_hit = False
+
+    def take_counts(self):
+        """
+        counts for the page that just ended, then start over for the next one
+        """
+        with self.lock:
+            counts = {
+                "blocked_requests": self.blocked_requests,
+                "allowed_requests": self.allowed_requests,
+                "allowed_bytes": self.allowed_bytes,
+                "budget_hit": self.budget_hit,
+            }
+            budget_was_hit = self.budget_hit
+            self.reset_counts()
+        if budget_was_hit:
+            self.cdp.send_nowait("Fetch.enable", {"patterns": self.rules.fetch_patterns()})
+        return counts
+
+    def should_block(self, params):
+        kind = params.get("resourceType")
+        url = params["request"]["url"]
+
+        if kind == "Document" and params.get("frameId") == self.target_id:
+            self.page_site = site_of(url)
+            return False  # the page itself always loads
+        if self.budget_hit:
+            return True
+        if kind in self.rules.resource_types:
+            return True
+        if any(fnmatchcase(url, pattern) for pattern in self.rules.url_patterns):
+            return True
+        if kind == "Document":
+            return self.rules.block_iframes
+        if kind == "Script" and self.rules.block_third_party_scripts:
+            return site_of(url) != self.page_site
+        return False
+
+    def on_paused(self, params):
+        # reader thread: answer without waiting so the page is never stalled on us
+        if self.should_block(params):
+            with self.lock:
+                self.blocked_requests += 1
+            self.cdp.send_nowait("Fetch.failRequest", {"requestId": params["requestId"],
+                                                       "errorReason": "BlockedByClient"})
+        else:
+            self.cdp.send_nowait("Fetch.continueRequest", {"requestId": params["requestId"]})
+
+    def on_finished(self, params):
+        with self.lock:
+            self.allowed_requests += 1
+            self.allowed_bytes += int(params.get("encodedDataLength") or 0)
+            over_budget = self.rules.byte_budget and not self.budget_hit \
+                and self.allowed_bytes > self.rules.byte_budget
+            if over_budget:
+                self.budget_hit = True
+        if over_budget:
+            # from now on every request pauses and is failed (except a new page)
+            self.cdp.send_nowait("Fetch.enable", {"patterns": [{"urlPattern": "*"}]})
+
+    def navigate(self, url: str):
+        self.cdp.send_nowait("Page.navigate", {"url": url})
+
+    def close(self):
+        self.cdp.close()
+
+
+def attach_blocker(driver, rules: BlockRules, target_id: str = None):
+    """
+    RequestBlocker for the current window (or target_id), None when devtools is unreachable
+    """
+    try:
+        if target_id is None:
+            return RequestBlocker.for_driver(driver, rules)
+        return RequestBlocker.for_target(debugger_address(driver), target_id, rules)
+    except Exception as e:
+        print(f"[WARNING] Request blocking unavailable: {e}")
+        return None
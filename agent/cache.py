@@ -0,0 +1,119 @@
+# ==============================
+# cache.py
+# on-disk search result cache:
+#   - sqlite file, query -> links (+ how many were asked for)
+#   - per-engine TTLs
+#   - LRU eviction under a size cap
+# ==============================
+
+import json
+import sqlite3
+import time
+import unicodedata
+
+
+# seconds a result set stays fresh, per engine that produced it
+DEFAULT_TTLS = {
+    "duckduckgo": 24 * 3600,
+    "bing": 24 * 3600,
+    "google": 12 * 3600,
+    "merge": 12 * 3600,
+}
+
+
+def normalize_query(query: str):
+    """
+    "  Python   Tips " and "python tips" share one cache entry
+    """
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """
+    persistent query -> links cache
+    Responsibilities:
+    - look up fresh results for a normalized query
+    - store results with the engine that produced them
+    - evict least recently used entries above max_entries
+    """
+
+    def __init__(self, path: str, max_entries: int = 500, ttls=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " query TEXT PRIMARY KEY,"
+            " engine TEXT NOT NULL,"
+            " links TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " requested INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self.db.commit()
+
+    def get(self, query: str, max_results: int = 5):
+        """
+        cached links or None when missing, expired or too short for max_results
+        """
+        entry = self.get_entry(query, max_results)
+        return entry[1] if entry else None
+
+    def get_entry(self, query: str, max_results: int = 5):
+        """
+        (engine, links) or None, same freshness rules as get()
+        """
+        key = normalize_query(query)
+        row = self.db.execute("SELECT engine, links, created, requested FROM results WHERE query = ?",
+                              (key,)).fetchone()
+        if row is None:
+            return None
+
+        engine, links, created, requested = row
+        now = time.time()
+        if now - created > self.ttls.get(engine, 0):
+            self.db.execute("DELETE FROM results WHERE query = ?", (key,))
+            self.db.commit()
+            return None
+
+        links = json.loads(links)
+        # an engine may return fewer links than asked for, what counts is the request
+        if requested < max_results:
+            return None  # cached run asked for fewer links than we need now
+
+        self.db.execute("UPDATE results SET accessed = ? WHERE query = ?", (now, key))
+        self.db.commit()
+        return engine, links[:max_results]
+
+    def put(self, query: str, engine: str, links, requested: int = None):
+        """
+        store results, engines without a TTL (eg demo links) are never cached
+        requested: how many links the search asked for (defaults to len(links))
+        """
+        if not links or not self.ttls.get(engine):
+            return
+
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO results (query, engine, links, created, accessed, requested)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (normalize_query(query), engine, json.dumps(links), now, now, requested or len(links)),
+        )
+        self.evict()
+        self.db.commit()
+
+    def evict(self):
+        """
+        drop least recently used rows above the size cap
+        """
+        self.db.execute(
+            "DELETE FROM results WHERE query IN ("
+            " SELECT query FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,188 @@
+# ==============================
+# cdp.py
+# minimal chrome devtools protocol client:
+#   - one websocket per target (page or browser)
+#   - blocking, fire-and-forget and asyncio commands
+#   - event callbacks (Page.loadEventFired, Runtime.bindingCalled, ...)
+# ==============================
+
+import asyncio
+import itertools
+import json
+import threading
+import urllib.request
+from collections import defaultdict
+
+
+class CdpError(Exception):
+    """
+    error answer from the devtools protocol
+    """
+
+
+def devtools_json(address: str, path: str, method: str = "GET"):
+    """
+    call chrome's devtools http endpoint (/json/version, /json/list, ...)
+    """
+    request = urllib.request.Request(f"http://{address}{path}", method=method)
+    with urllib.request.urlopen(request, timeout=2) as response:
+        body = response.read().decode()
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body  # /json/close answers with plain text
+
+
+def debugger_address(driver):
+    """
+    host:port of the devtools endpoint behind a selenium chrome driver
+    """
+    return driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+
+class CdpSession:
+    """
+    devtools websocket connection
+    Responsibilities:
+    - send commands and match answers by id
+    - dispatch events to registered callbacks (on the reader thread)
+    """
+
+    def __init__(self, ws_url: str, timeout: float = 10):
+        import websocket  # installed with selenium
+
+        self.timeout = timeout
+        self.ws = websocket.create_connection(ws_url, timeout=None, suppress_origin=True)
+        self.ids = itertools.count(1)
+        self.pending = {}                   # id -> callback(result, error)
+        self.listeners = defaultdict(list)  # event name -> callbacks
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader.start()
+
+    @classmethod
+    def for_driver(cls, driver):
+        """
+        connect to the page target behind the driver's current window
+        (chromedriver window handles are devtools target ids)
+        """
+        address = debugger_address(driver)
+        handle = driver.current_window_handle
+        for target in devtools_json(address, "/json/list"):
+            if target.get("id") == handle:
+                return cls(target["webSocketDebuggerUrl"])
+        raise CdpError(f"No devtools target for window {handle}")
+
+    @classmethod
+    def for_browser(cls, address: str):
+        """
+        connect to the browser-wide target (cookies, targets, ...)
+        """
+        return cls(devtools_json(address, "/json/version")["webSocketDebuggerUrl"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method: str, params, callback):
+        message_id = next(self.ids)
+        if callback is not None:
+            self.pending[message_id] = callback
+        payload = json.dumps({"id": message_id, "method": method, "params": params or {}})
+        with self.send_lock:
+            self.ws.send(payload)
+        return message_id
+
+    def send(self, method: str, params=None, timeout=None):
+        """
+        blocking command, returns the result dict
+        """
+        done = threading.Event()
+        answer = {}
+
+        def callback(result, error):
+            answer["result"], answer["error"] = result, error
+            done.set()
+
+        message_id = self.request(method, params, callback)
+        if not done.wait(timeout or self.timeout):
+            self.pending.pop(message_id, None)
+            raise CdpError(f"{method} timed out")
+        if answer["error"]:
+            raise CdpError(f"{method}: {answer['error'].get('message')}")
+        return answer["result"]
+
+    def send_nowait(self, method: str, params=None):
+        """
+        fire-and-forget command, safe to call from event callbacks
+        """
+        self.request(method, params, None)
+
+    async def send_async(self, method: str, params=None, timeout=None):
+        """
+        asyncio command, the answer is handed over from the reader thread
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(result, error):
+            if future.done():
+                return
+            if error:
+                future.set_exception(CdpError(f"{method}: {error.get('message')}"))
+            else:
+                future.set_result(result)
+
+        def callback(result, error):
+            loop.call_soon_threadsafe(resolve, result, error)
+
+        message_id = self.request(method, params, callback)
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        finally:
+            self.pending.pop(message_id, None)
+
+    def on(self, event: str, callback):
+        """
+        call callback(params) for every event with this name
+        """
+        self.listeners[event].append(callback)
+
+    def off(self, event: str, callback):
+        if callback in self.listeners.get(event, []):
+            self.listeners[event].remove(callback)
+
+    def read_loop(self):
+        while not self.closed:
+            try:
+                message = json.loads(self.ws.recv())
+            except Exception:
+                break  # socket closed (browser gone or session closed)
+
+            if "id" in message:
+                callback = self.pending.pop(message["id"], None)
+                if callback is not None:
+                    callback(message.get("result"), message.get("error"))
+            elif "method" in message:
+                for callback in list(self.listeners.get(message["method"], [])):
+                    try:
+                        callback(message.get("params", {}))
+                    except Exception as e:
+                        print(f"[WARNING] CDP listener for {message['method']} failed: {e}")
+
+        # wake up anyone still waiting
+        for callback in list(self.pending.values()):
+            callback(None, {"message": "connection closed"})
+        self.pending.clear()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.ws.close()
+            except Exception:
+                pass
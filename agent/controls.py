@@ -0,0 +1,82 @@
+# ==============================
+# controls.py
+# thread-safe command queue between the keyboard listener and the main loop
+# ==============================
+
+import queue
+import time
+
+
+# key -> (command, value)
+KEY_COMMANDS = {
+    "1": ("speed", "slow"),
+    "2": ("speed", "medium"),
+    "3": ("speed", "fast"),
+    "p": ("pause", None),
+    "n": ("next", None),
+    "b": ("prev", None),
+    "q": ("quit", None),
+}
+
+
+class Command:
+    """
+    one user command, stamped when it was queued
+    """
+    __slots__ = ("name", "value", "queued_at")
+
+    def __init__(self, name: str, value=None):
+        self.name = name
+        self.value = value
+        self.queued_at = time.perf_counter()
+
+
+class ControlQueue:
+    """
+    commands flow from input threads to the main loop
+    Responsibilities:
+    - queue commands from any thread
+    - let the main loop block until a command arrives or a tick is due
+    - measure key-to-handled latency
+    """
+
+    def __init__(self):
+        self.commands = queue.Queue()
+        self.latencies = []
+
+    def put(self, name: str, value=None):
+        self.commands.put(Command(name, value))
+
+    def put_key(self, key: str):
+        """
+        translate a key press into a command, unknown keys are ignored
+        """
+        if key in KEY_COMMANDS:
+            self.put(*KEY_COMMANDS[key])
+
+    def wait(self, timeout=None):
+        """
+        block until a command arrives (returns it) or timeout passes (returns None)
+        timeout None blocks until the next command
+        """
+        try:
+            if timeout is not None and timeout <= 0:
+                return self.commands.get_nowait()
+            return self.commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def handled(self, command: Command):
+        """
+        record how long the command waited before the main loop acted on it
+        """
+        self.latencies.append(time.perf_counter() - command.queued_at)
+
+    def latency_summary(self):
+        """
+        (count, median ms, max ms) of handled command latencies
+        """
+        if not self.latencies:
+            return 0, 0.0, 0.0
+        ordered = sorted(self.latencies)
+        return len(ordered), ordered[len(ordered) // 2] * 1000, ordered[-1] * 1000
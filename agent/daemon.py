@@ -0,0 +1,302 @@
+# ==============================
+# daemon.py
+# long-lived driver daemon:
+#   - keeps pre-warmed chrome instances running
+#   - leases them to agents over a local socket
+#   - resets cookies / tabs / scroll position on release
+#
+# usage:
+#   python -m agent.daemon start [--browsers 2] [--port 9517] [--headless]
+#   python -m agent.daemon status
+#   python -m agent.daemon stop
+# ==============================
+
+import json
+import os
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from agent.browser import build_options
+from agent.cdp import CdpSession, devtools_json
+
+
+DEFAULT_PORT = 9517           # lease server
+FIRST_DEBUG_PORT = 9301       # chrome remote debugging ports start here
+
+CHROME_NAMES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+# switches chromedriver adds to its own launches, the warm browser needs them too
+CHROMEDRIVER_SWITCHES = ["--disable-popup-blocking", "--no-first-run", "--no-default-browser-check"]
+
+
+def find_chrome():
+    """
+    chrome binary from ASSA_CHROME or the usual names on PATH
+    """
+    if os.environ.get("ASSA_CHROME"):
+        return os.environ["ASSA_CHROME"]
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    if sys.platform == "win32":
+        path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+        if os.path.exists(path):
+            return path
+    elif sys.platform == "darwin":
+        path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+        if os.path.exists(path):
+            return path
+    raise RuntimeError("Chrome not found, set ASSA_CHROME to the browser binary")
+
+
+class WarmBrowser:
+    """
+    one chrome process started with remote debugging, ready to be attached to
+    """
+
+    def __init__(self, chrome: str, debug_port: int, headless: bool):
+        self.debug_port = debug_port
+        self.address = f"127.0.0.1:{debug_port}"
+        self.profile = tempfile.mkdtemp(prefix="assa-profile-")
+        self.leased = False
+
+        args = [a for a in build_options(headless).arguments if a != "--start-maximized"]
+        # switches chromedriver adds on its own launches; without the popup one
+        # SearchRacer's script-driven window.open tabs are blocked
+        args += [a for a in CHROMEDRIVER_SWITCHES if a not in args]
+        self.process = subprocess.Popen(
+            [chrome, f"--remote-debugging-port={debug_port}", f"--user-data-dir={self.profile}", *args, "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def wait_ready(self, timeout: float = 15):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                devtools_json(self.address, "/json/version")
+                return True
+            except OSError:
+                time.sleep(0.1)
+        return False
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def reset(self):
+        """
+        clear cookies, close extra tabs, leave one blank tab at the top
+        """
+        with CdpSession.for_browser(self.address) as session:
+            session.send("Storage.clearCookies")
+
+        pages = [t for t in devtools_json(self.address, "/json/list") if t.get("type") == "page"]
+        # open the fresh tab first so the browser never runs out of windows
+        devtools_json(self.address, "/json/new?about:blank", method="PUT")
+        for page in pages:
+            devtools_json(self.address, f"/json/close/{page['id']}")
+
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.profile, ignore_errors=True)
+
+
+class DriverDaemon:
+    """
+    pool of warm browsers behind a tiny json-lines lease server
+    Responsibilities:
+    - start / restart chrome instances
+    - hand out a free instance on acquire
+    - reset the instance on release
+    """
+
+    def __init__(self, browsers: int = 1, port: int = DEFAULT_PORT, headless: bool = False):
+        self.port = port
+        self.headless = headless
+        self.chrome = find_chrome()
+        self.lock = threading.Lock()
+        self.browsers = []
+        for i in range(max(1, browsers)):
+            self.browsers.append(self.launch(FIRST_DEBUG_PORT + i))
+        self.server = None
+
+    def launch(self, debug_port: int):
+        browser = WarmBrowser(self.chrome, debug_port, self.headless)
+        if not browser.wait_ready():
+            print(f"[WARNING] Chrome on port {debug_port} did not come up")
+        return browser
+
+    def acquire(self):
+        with self.lock:
+            for i, browser in enumerate(self.browsers):
+                if browser.leased:
+                    continue
+                if not browser.alive():
+                    # crashed while idle, replace before handing out
+                    browser.stop()
+                    browser = self.browsers[i] = self.launch(browser.debug_port)
+                browser.leased = True
+                return browser.address
+        return None
+
+    def release(self, address: str):
+        with self.lock:
+            for browser in self.browsers:
+                if browser.address == address:
+                    try:
+                        browser.reset()
+                    except Exception as e:
+                        print(f"[WARNING] Reset failed on {address}, restarting browser: {e}")
+                        browser.stop()
+                        self.browsers[self.browsers.index(browser)] = self.launch(browser.debug_port)
+                    browser.leased = False
+                    return True
+        return False
+
+    def status(self):
+        with self.lock:
+            return [{"address": b.address, "leased": b.leased, "alive": b.alive()} for b in self.browsers]
+
+    def handle(self, request: dict):
+        op = request.get("op")
+        if op == "acquire":
+            address = self.acquire()
+            return {"ok": address is not None, "address": address}
+        if op == "release":
+            return {"ok": self.release(request.get("address"))}
+        if op == "status":
+            return {"ok": True, "browsers": self.status()}
+        if op == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def serve(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                leased = []     # addresses acquired over this connection, not released yet
+                try:
+                    for line in self.rfile:
+                        try:
+                            request = json.loads(line)
+                            reply = daemon.handle(request)
+                        except Exception as e:
+                            request, reply = {}, {"ok": False, "error": str(e)}
+                        if request.get("op") == "acquire" and reply.get("ok"):
+                            leased.append(reply["address"])
+                        elif request.get("op") == "release" and request.get("address") in leased:
+                            leased.remove(request["address"])
+                        self.wfile.write((json.dumps(reply) + "\n").encode())
+                except OSError:
+                    pass    # client went away mid-reply
+                finally:
+                    # the client holds its lease connection for the whole session: when
+                    # it closes (exit, crash, Ctrl+C) the browser goes back to the pool
+                    for address in leased:
+                        print(f"[INFO] Client holding {address} went away, releasing it")
+                        daemon.release(address)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", self.port), Handler)
+        print(f"[INFO] Driver daemon listening on 127.0.0.1:{self.port} with {len(self.browsers)} warm browser(s)")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            for browser in self.browsers:
+                browser.stop()
+            print("[INFO] Driver daemon stopped")
+
+
+# debugger address -> open connection that holds its lease (see DriverDaemon.serve)
+_leases = {}
+
+
+def exchange(sock, request: dict):
+    """
+    one request / reply over an open daemon connection, None when it closed
+    """
+    sock.sendall((json.dumps(request) + "\n").encode())
+    reply = sock.makefile().readline()
+    return json.loads(reply) if reply else None
+
+
+def send(request: dict, port: int = DEFAULT_PORT, timeout: float = 10):
+    """
+    send one request to the daemon, None when no daemon is running
+    """
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+            return exchange(sock, request)
+    except OSError:
+        return None
+
+
+def acquire_browser(port: int = DEFAULT_PORT):
+    """
+    debugger address of a warm browser, None when daemon is down or busy
+    the connection stays open as the lease, if this process dies the daemon
+    takes the browser back
+    """
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=1)
+    except OSError:
+        return None
+    try:
+        reply = exchange(sock, {"op": "acquire"})
+    except OSError:
+        reply = None
+    if reply and reply.get("ok"):
+        sock.settimeout(10)
+        _leases[reply["address"]] = sock
+        return reply["address"]
+    sock.close()
+    return None
+
+
+def release_browser(address: str, port: int = DEFAULT_PORT):
+    sock = _leases.pop(address, None)
+    if sock is None:
+        send({"op": "release", "address": address}, port)
+        return
+    try:
+        exchange(sock, {"op": "release", "address": address})
+    except OSError:
+        pass    # daemon gone, or it already released the browser when the socket dropped
+    finally:
+        sock.close()
+
+
+def main(argv):
+    command = argv[0] if argv else "start"
+    port = int(argv[argv.index("--port") + 1]) if "--port" in argv else DEFAULT_PORT
+
+    if command == "start":
+        browsers = int(argv[argv.index("--browsers") + 1]) if "--browsers" in argv else 1
+        DriverDaemon(browsers, port, headless="--headless" in argv).serve()
+    elif command in ("status", "stop"):
+        reply = send({"op": "status" if command == "status" else "shutdown"}, port)
+        if reply is None:
+            print("[INFO] No driver daemon running")
+        else:
+            print(json.dumps(reply, indent=2))
+    else:
+        print(f"[ERROR] Unknown command '{command}' (start / status / stop)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,11 @@
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.live import Live
-from rich.text import Text
-from rich.align import Align
-from rich import box
+import sys
+from collections import deque
+
+# rich is imported where it is used: headless dashboards (batch mode, pipes)
+# never load it
+from agent import instrument
+from agent.scroller import speed_label
+from agent.tracker import format_duration
 
 class Dashboard:
     """
@@ -13,16 +14,104 @@ class Dashboard:
     - show live status (current site, speed, paused/scrolling)
     - display key controls
     - display session summary at the end
+
+    show_status / show_workers only store a small view model; the panel is
+    rebuilt lazily by Live's refresh thread (at most REFRESH_RATE times per
+    second) and only when a shown field actually changed.
     """
-    def __init__(self):
-        self.console = Console()
+    REFRESH_RATE = 15
+    SUMMARY_ROWS = 50
+
+    def __init__(self, headless=None, stream=None):
+        """
+        headless: skip Rich and print plain status lines on change
+                  (None = auto, headless when stdout is not a terminal)
+        stream: where headless output goes (default stdout)
+        """
+        if headless is None:
+            headless = not sys.stdout.isatty()
+        self.headless = headless
+        self.stream = stream
+        if headless:
+            self.console = None
+        else:
+            from rich.console import Console
+            self.console = Console()
         self.panel = None      # stores current panel content
         self.live = None       # single Live instance
 
+        self.view = None           # latest view model, set by show_status / show_workers
+        self.rendered_view = None  # view model self.panel was built from
+        self.renders = 0           # number of panel rebuilds (for profiling)
+
     def show_status(self, site_index, total_sites, url, speed, status):
         """
         Ultra-compact dynamic status display
         """
+        self.update_view(("status", site_index, total_sites, url, speed, status))
+
+    def show_workers(self, rows, queued):
+        """
+        Pool mode display - one row per worker
+        rows: (worker_id, url, status, visited, restarts)
+        """
+        self.update_view(("workers", tuple(rows), queued))
+
+    def update_view(self, view):
+        """
+        store the new view model, cheap enough to call on every loop iteration
+        """
+        if view == self.view:
+            return
+        self.view = view
+
+        if self.headless:
+            with instrument.span("dashboard.print"):
+                self.print_plain(view)
+            return
+
+        # Initialize live display once, it pulls the panel via get_renderable
+        if self.live is None:
+            from rich.live import Live
+            self.live = Live(get_renderable=self.current_panel, refresh_per_second=self.REFRESH_RATE,
+                             console=self.console, auto_refresh=True)
+            self.live.start()
+
+    def current_panel(self):
+        """
+        called by Live on every refresh, rebuilds only when the view or width changed
+        """
+        key = (self.view, self.console.size.width)
+        if key != self.rendered_view:
+            with instrument.span("dashboard.render"):
+                if self.view[0] == "status":
+                    self.panel = self.build_status_panel(*self.view[1:])
+                else:
+                    self.panel = self.build_workers_panel(*self.view[1:])
+            self.rendered_view = key
+            self.renders += 1
+        return self.panel
+
+    def print_plain(self, view):
+        """
+        headless output, one line per change
+        """
+        if view[0] == "status":
+            _, site_index, total_sites, url, speed, status = view
+            print(f"[STATUS] {site_index}/{total_sites} {url} {speed} {status}", file=self.stream, flush=True)
+        else:
+            _, rows, queued = view
+            busy = sum(1 for row in rows if row[2] not in ("DONE", "IDLE"))
+            done = sum(row[3] for row in rows)
+            print(f"[STATUS] {busy} workers busy, {done} visited, {queued} queued", file=self.stream, flush=True)
+
+    def build_status_panel(self, site_index, total_sites, url, speed, status):
+        """
+        Ultra-compact single panel: position, domain, speed, status, controls
+        """
+        from rich import box
+        from rich.panel import Panel
+
         w = self.console.size.width
         
         # Extract domain from URL for compact display
@@ -39,7 +128,7 @@ class Dashboard:
         short_domain = domain[:max_domain] + "..." if len(domain) > max_domain else domain
         
         # Create compact status line
-        status_line = f"[cyan]{site_index}/{total_sites}[/cyan] │ [white]{short_domain}[/white] │ [yellow]{speed[0].upper()}[/yellow] │ [green]{status[:4]}[/green]"
+        status_line = f"[cyan]{site_index}/{total_sites}[/cyan] │ [white]{short_domain}[/white] │ [yellow]{speed_label(speed)}[/yellow] │ [green]{status[:4]}[/green]"
         
         # Dynamic controls based on width
         if w < 50:
@@ -60,18 +149,68 @@ class Dashboard:
             expand=True,
             padding=(0, 1)
         )
+        return panel
 
-        # Initialize or update live display with minimal overhead
-        if self.live is None:
-            self.live = Live(panel, refresh_per_second=15, console=self.console, auto_refresh=True)
-            self.live.start()
-        else:
-            self.live.update(panel)
+    def build_workers_panel(self, rows, queued):
+        """
+        Pool table, one row per worker
+        """
+        from rich import box
+        from rich.panel import Panel
+        from rich.table import Table
+
+        w = self.console.size.width
+        table = Table(box=box.MINIMAL, expand=True, show_header=True, header_style="bold")
+        table.add_column("#", width=3, justify="center", style="cyan")
+        table.add_column("SITE", style="white")
+        table.add_column("STATUS", width=10, style="green")
+        table.add_column("DONE", width=5, justify="center", style="yellow")
+
+        max_url = max(10, w - 30)
+        for worker_id, url, status, visited, restarts in rows:
+            site = url or "-"
+            site = site if len(site) <= max_url else site[:max_url-3] + "..."
+            if restarts:
+                status = f"{status} ↻{restarts}"
+            table.add_row(str(worker_id), site, status, str(visited))
+
+        panel = Panel(
+            table,
+            title=f"[bold]assa pool[/bold] [dim]{queued} queued[/dim]",
+            border_style="cyan",
+            box=box.MINIMAL,
+            expand=True,
+            padding=(0, 1)
+        )
+        return panel
 
     def show_summary(self, records):
         """
         Ultra-compact responsive summary
+        records: iterable of visit records (streamed from the tracker file),
+                 only the last SUMMARY_ROWS are kept for the table
         """
+        shown = deque(maxlen=self.SUMMARY_ROWS)
+        count, total_time = 0, 0.0
+        for r in records:
+            count += 1
+            total_time += r['duration']
+            shown.append((count, r))
+
+        if self.headless:
+            print("[SUMMARY]", file=self.stream)
+            for i, r in shown:
+                print(f"{i}. {r['url']} - {format_duration(r['duration'])}", file=self.stream)
+            if not count:
+                print("No sites visited", file=self.stream)
+            else:
+                print(f"{count} sites, {format_duration(total_time)} total", file=self.stream)
+            return
+
+        from rich import box
+        from rich.panel import Panel
+        from rich.table import Table
+
         if self.live:
             self.live.stop()
 
@@ -81,7 +220,7 @@ class Dashboard:
         header = Panel("[bold]SUMMARY[/bold]", border_style="green", box=box.MINIMAL, padding=(0,1))
         self.console.print(header)
 
-        if not records:
+        if not count:
             self.console.print(Panel("[dim]No sites visited[/dim]", border_style="yellow", box=box.MINIMAL, padding=(0,1)))
             return
 
@@ -93,23 +232,24 @@ class Dashboard:
             table.add_column("#", width=3, justify="center", style="cyan")
             table.add_column("SITE", style="white")
             table.add_column("TIME", width=8, justify="center", style="green")
-            for i, r in enumerate(records, 1):
+            for i, r in shown:
                 url = r['url']
                 domain = (url.split('/')[2] if '//' in url and len(url.split('/'))>2 else url).replace('www.', '')
                 site = domain[:15] + "..." if len(domain) > 15 else domain
-                table.add_row(str(i), site, r['time_spent'])
+                table.add_row(str(i), site, format_duration(r['duration']))
         else:
             table.add_column("#", width=4, justify="center", style="cyan")
             table.add_column("URL", style="white")
             table.add_column("DURATION", width=12, justify="center", style="green")
             max_url = max(30, w - 25)
-            for i, r in enumerate(records, 1):
+            for i, r in shown:
                 url = r['url']
                 site = url if len(url) <= max_url else url[:max_url-3] + "..."
-                table.add_row(str(i), site, r['time_spent'])
+                table.add_row(str(i), site, format_duration(r['duration']))
 
         self.console.print(table)
         
         # Footer (minimal)
-        footer = Panel("[dim]Done[/dim]", border_style="dim", box=box.MINIMAL, padding=(0,1))
+        more = f" • showing last {len(shown)}" if count > len(shown) else ""
+        footer = Panel(f"[dim]Done • {count} sites • {format_duration(total_time)}{more}[/dim]", border_style="dim", box=box.MINIMAL, padding=(0,1))
         self.console.print(footer)
@@ -0,0 +1,183 @@
+# ==============================
+# extract.py
+# page content collected while the scroller moves, no second page load:
+#   - one batched in-page script every N scroll steps returns the blocks of
+#     text that have come into view since the last call, plus headings and links
+#   - the page remembers what it already returned (WeakSet), python only
+#     buffers up to one chunk per visit
+#   - chunks stream to a gzip JSONL file next to the session records, keyed
+#     by the visit's url + started_at
+# ==============================
+
+import gzip
+import json
+import threading
+
+from agent import instrument
+
+
+# returns {text: [..], headings: [[level, text]], links: [[href, text]], chars}
+# for blocks shown since the last call, arguments: max characters (text + hrefs)
+COLLECT_SCRIPT = """
+var maxChars = arguments[0];
+var x = window.__assaExtract;
+if (!x) { x = window.__assaExtract = {seen: new WeakSet(), hrefs: new Set()}; }
+var SELECTOR = 'h1,h2,h3,h4,h5,h6,p,li,blockquote,pre,figcaption,dt,dd,td';
+var bottom = window.innerHeight;
+var out = {text: [], headings: [], links: [], chars: 0};
+var blocks = document.querySelectorAll(SELECTOR);
+for (var i = 0; i < blocks.length && out.chars < maxChars; i++) {
+    var el = blocks[i];
+    if (x.seen.has(el)) { continue; }
+    var rect = el.getBoundingClientRect();
+    if (rect.top >= bottom) { continue; }            // not scrolled into view yet
+    x.seen.add(el);
+    // nested blocks (p inside li, ...) are part of this text already
+    el.querySelectorAll(SELECTOR).forEach(function (inner) { x.seen.add(inner); });
+    if (rect.height === 0 || el.closest('nav')) { continue; }
+
+    var text = (el.innerText || '').replace(/\\s+/g, ' ').trim();
+    if (!text) { continue; }
+    out.text.push(text);
+    out.chars += text.length;
+    if (/^H[1-6]$/.test(el.tagName)) { out.headings.push([+el.tagName[1], text]); }
+
+    el.querySelectorAll('a[href]').forEach(function (a) {
+        var href = a.href;
+        if (!/^https?:/.test(href) || x.hrefs.has(href)) { return; }
+        x.hrefs.add(href);
+        out.chars += href.length;
+        out.links.push([href, (a.innerText || '').replace(/\\s+/g, ' ').trim().slice(0, 200)]);
+    });
+}
+return out;
+"""
+
+
+def content_path(session_path: str):
+    """
+    content file that belongs to a session record file (x.jsonl -> x.content.jsonl.gz)
+    """
+    base = session_path[:-len(".jsonl")] if session_path.endswith(".jsonl") else session_path
+    return base + ".content.jsonl.gz"
+
+
+class ContentWriter:
+    """
+    one gzip JSONL file per session, shared by every visit (and pool worker)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = gzip.open(path, "at", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.chunks = 0
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            # sync flush: what is on disk stays readable if the session dies
+            self.file.flush()
+            self.chunks += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def iter_content(path: str):
+    """
+    read content chunks back, in the order they were written
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class PageExtractor:
+    """
+    collects the content of one visit while it is scrolled
+    Responsibilities:
+    - run the collect script every N scroll steps (and once more at the end)
+    - buffer text / headings / links up to one chunk, then hand it to the writer
+    - stop collecting past a per-visit character cap
+    """
+
+    def __init__(self, writer: ContentWriter, url: str, started_at: float, every: int = 10,
+                 chunk_chars: int = 32_000, max_chars: int = 1_000_000):
+        """
+        every: scroll steps between two collect calls
+        chunk_chars: buffered characters that trigger a chunk
+        max_chars: characters collected per visit at most
+        """
+        self.writer = writer
+        self.url = url
+        self.started_at = started_at
+        self.every = max(1, every)
+        self.chunk_chars = chunk_chars
+        self.max_chars = max_chars
+
+        self.steps = 0
+        self.chunk = 0
+        self.chars = 0          # collected for this visit so far
+        self.buffer = self.empty_buffer()
+
+    @classmethod
+    def for_visit(cls, writer: ContentWriter, visit, **kwargs):
+        """
+        extractor keyed like the visit's session record (url + started_at)
+        """
+        return cls(writer, visit.url, round(visit.started_at, 3), **kwargs)
+
+    @staticmethod
+    def empty_buffer():
+        return {"text": [], "headings": [], "links": [], "chars": 0}
+
+    def on_step(self, driver, done: bool = False):
+        """
+        called by the scroller after every step, collects every N steps and at the end
+        """
+        self.steps += 1
+        if done or self.steps % self.every == 0:
+            self.collect(driver)
+
+    def collect(self, driver):
+        remaining = self.max_chars - self.chars
+        if remaining <= 0:
+            return
+        try:
+            with instrument.span("extract.collect"):
+                result = driver.execute_script(COLLECT_SCRIPT, min(remaining, self.chunk_chars))
+        except Exception:
+            return  # page mid-navigation, the next call picks the content up
+        if not isinstance(result, dict):
+            return
+
+        self.chars += result["chars"]
+        for key in ("text", "headings", "links"):
+            self.buffer[key].extend(result[key])
+        self.buffer["chars"] += result["chars"]
+        if self.buffer["chars"] >= self.chunk_chars:
+            self.flush()
+
+    def flush(self):
+        """
+        write the buffered content as one chunk
+        """
+        buffer = self.buffer
+        if not (buffer["text"] or buffer["links"]):
+            return
+        self.writer.write({"url": self.url, "started_at": self.started_at, "chunk": self.chunk,
+                           "text": buffer["text"], "headings": buffer["headings"], "links": buffer["links"]})
+        self.chunk += 1
+        self.buffer = self.empty_buffer()
+
+    def finish(self, driver=None):
+        """
+        end of the visit: pick up what is in view now and write the last chunk
+        """
+        if driver is not None:
+            self.collect(driver)
+        self.flush()
@@ -0,0 +1,230 @@
+# ==============================
+# frontier.py
+# links waiting to be visited:
+#   - canonical urls (engine redirects unwrapped, tracking params dropped,
+#     scheme / host normalised)
+#   - duplicates removed, also against a persistent visited index
+#   - round-robin across domains so one site is never hit back to back
+# ==============================
+
+import base64
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# query parameters that only identify the click, never the page
+TRACKING_PARAMS = {
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok", "ref_src", "spm", "srsltid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "ga_")
+
+# (host suffix, path prefix, param) of search engine click-through redirects
+REDIRECTS = [
+    ("duckduckgo.com", "/l/", "uddg"),
+    ("google.com", "/url", "q"),
+    ("google.com", "/url", "url"),
+    ("bing.com", "/ck/a", "u"),
+]
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def unwrap(url: str):
+    """
+    target of an engine redirect link, or url unchanged
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    for suffix, path, param in REDIRECTS:
+        if not (host == suffix or host.endswith("." + suffix)) or not parts.path.startswith(path):
+            continue
+        value = dict(parse_qsl(parts.query)).get(param)
+        if not value:
+            continue
+        if suffix == "bing.com" and value.startswith("a1"):
+            # bing: "a1" + unpadded urlsafe base64 of the target
+            try:
+                value = base64.urlsafe_b64decode(value[2:] + "=" * (-len(value[2:]) % 4)).decode()
+            except ValueError:
+                continue
+        if value.startswith("http"):
+            return value
+    return url
+
+
+def canonicalize(url: str):
+    """
+    the url we actually load: redirects unwrapped, tracking params and
+    fragment dropped (#! app routes are kept), lowercase scheme / host, no
+    default port, sorted query; userinfo and IPv6 brackets are kept
+    """
+    for _ in range(3):  # redirects can be nested
+        target = unwrap(url)
+        if target == url:
+            break
+        url = target
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    netloc = f"[{host}]" if ":" in host else host    # IPv6 literal
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username is not None:
+        userinfo = parts.netloc.rpartition("@")[0]  # as written, percent-encoding intact
+        netloc = f"{userinfo}@{netloc}"
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    # "#!/route" is a page of a single-page app, any other fragment is a spot on the page
+    fragment = parts.fragment if parts.fragment.startswith("!") else ""
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(sorted(query)), fragment))
+
+
+def url_key(url: str):
+    """
+    dedupe key of a canonical url: http/https, www. and userinfo variants are one page
+    """
+    parts = urlsplit(url)
+    host = parts.netloc.rpartition("@")[2]  # credentials do not make it another page
+    host = host[4:] if host.startswith("www.") else host
+    path = parts.path.rstrip("/") or "/"
+    key = f"{host}{path}?{parts.query}" if parts.query else f"{host}{path}"
+    return f"{key}#{parts.fragment}" if parts.fragment else key
+
+
+def domain_of(url: str):
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class VisitedIndex:
+    """
+    persistent set of visited pages (sqlite, keyed by url_key)
+    Responsibilities:
+    - remember when a page was visited
+    - tell whether a page was visited within max_age seconds
+    """
+
+    def __init__(self, path: str, max_age: float = 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS visited ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " visited REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def seen(self, url: str):
+        row = self.db.execute("SELECT visited FROM visited WHERE key = ?", (url_key(url),)).fetchone()
+        return row is not None and time.time() - row[0] < self.max_age
+
+    def add(self, url: str):
+        self.db.execute("INSERT OR REPLACE INTO visited (key, url, visited) VALUES (?, ?, ?)",
+                        (url_key(url), url, time.time()))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class Frontier:
+    """
+    queue of canonical links to visit
+    Responsibilities:
+    - canonicalise and dedupe incoming links (queued, visited this session,
+      visited recently according to the index)
+    - order them round-robin by domain, at most max_per_domain per site
+    - remember which engine supplied each link
+    """
+
+    def __init__(self, visited: VisitedIndex = None, max_per_domain: int = 0):
+        self.visited = visited
+        self.max_per_domain = max_per_domain   # 0 = no limit
+        self.queue = deque()
+        self.keys = set()          # everything queued or taken this session
+        self.per_domain = {}       # domain -> links accepted
+        self.engines = {}          # canonical url -> engine
+        self.skipped_visited = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def add(self, urls, engines=None, revisit: bool = False):
+        """
+        queue new links, returns how many were accepted
+        engines: optional {raw url: engine name}
+        revisit: ignore the persistent visited index
+        """
+        added = []
+        for raw in urls:
+            if not raw or not raw.startswith("http"):
+                continue
+            url = canonicalize(raw)
+            key, domain = url_key(url), domain_of(url)
+            if key in self.keys:
+                continue
+            if self.max_per_domain and self.per_domain.get(domain, 0) >= self.max_per_domain:
+                continue
+            if not revisit and self.visited is not None and self.visited.seen(url):
+                self.skipped_visited += 1
+                continue
+            self.keys.add(key)
+            self.per_domain[domain] = self.per_domain.get(domain, 0) + 1
+            self.engines[url] = (engines or {}).get(raw)
+            added.append(url)
+
+        if added:
+            self.queue = deque(self.interleave(list(self.queue) + added))
+        return len(added)
+
+    @staticmethod
+    def interleave(urls):
+        """
+        round-robin by domain, keeping the search order inside each domain
+        """
+        buckets = OrderedDict()
+        for url in urls:
+            buckets.setdefault(domain_of(url), deque()).append(url)
+        ordered = []
+        while buckets:
+            for domain in list(buckets):
+                ordered.append(buckets[domain].popleft())
+                if not buckets[domain]:
+                    del buckets[domain]
+        return ordered
+
+    def pop(self):
+        """
+        next link to visit, None when the frontier is empty
+        """
+        return self.queue.popleft() if self.queue else None
+
+    def peek(self, count: int):
+        """
+        the next `count` links pop() will return (for prefetching)
+        """
+        return list(islice(self.queue, count))
+
+    def drain(self):
+        """
+        take every queued link at once (pool mode)
+        """
+        links = list(self.queue)
+        self.queue.clear()
+        return links
+
+    def mark_visited(self, url: str):
+        if self.visited is not None:
+            self.visited.add(url)
+
+    def close(self):
+        if self.visited is not None:
+            self.visited.close()
@@ -0,0 +1,130 @@
+# ==============================
+# governor.py
+# keeps long sessions inside a memory budget:
+#   - samples renderer memory (devtools Performance.getMetrics) and
+#     browser RSS (psutil, optional) between sites
+#   - over budget: recycle the tab + clear caches, still over on the next
+#     check: restart the browser
+# ==============================
+
+
+# a renderer past these is recycled even if the browser as a whole is fine
+TAB_HEAP_LIMIT_MB = 400
+MAX_DOCUMENTS = 50       # frames / documents leaked by the page
+MAX_MEMORY_RESTARTS = 3  # per session, past this only the tab is recycled
+
+
+def browser_rss_mb(driver):
+    """
+    resident memory of chromedriver + chrome processes in MB, None without psutil
+    """
+    try:
+        import psutil  # optional
+    except ImportError:
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+    except Exception:
+        return None  # attached browsers (daemon) are not our children
+
+    rss = 0
+    for proc in procs:
+        try:
+            rss += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return rss / 1e6
+
+
+def recycle_tab(driver):
+    """
+    move the session into a fresh blank tab and close the old one, so the old
+    renderer (DOM, JS heap) is freed; returns the new window handle
+    """
+    old = driver.current_window_handle
+    handle = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"]
+    driver.switch_to.window(handle)
+    driver.execute_cdp_cmd("Target.closeTarget", {"targetId": old})
+    return handle
+
+
+def clear_caches(driver):
+    """
+    drop the http cache and collect garbage in the current renderer
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+
+
+class MemoryGovernor:
+    """
+    decides between sites whether the browser needs recycling
+    Responsibilities:
+    - sample renderer heap / documents and browser RSS
+    - escalate: recycle tab first, restart the browser if that did not help
+    - keep the last sample for logging
+    """
+
+    def __init__(self, driver, browser_limit_mb: float = 2000, tab_limit_mb: float = TAB_HEAP_LIMIT_MB,
+                 max_restarts: int = MAX_MEMORY_RESTARTS):
+        self.driver = driver
+        self.browser_limit_mb = browser_limit_mb
+        self.tab_limit_mb = tab_limit_mb
+        self.max_restarts = max_restarts
+        self.restarts = 0           # browser restarts asked for so far (own budget, not the crash one)
+        self.recycled = False       # last check already recycled the tab
+        self.metrics_handle = None  # tab the Performance domain is enabled in
+        self.last_sample = {}
+
+    def sample(self):
+        """
+        {"heap_mb", "documents", "nodes", "rss_mb"}, missing values are None
+        """
+        sample = {"heap_mb": None, "documents": None, "nodes": None, "rss_mb": browser_rss_mb(self.driver)}
+        try:
+            # devtools domains are per tab: enable again after a tab switch
+            handle = self.driver.current_window_handle
+            if handle != self.metrics_handle:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                self.metrics_handle = handle
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+            values = {m["name"]: m["value"] for m in metrics}
+            sample["heap_mb"] = values.get("JSHeapTotalSize", 0) / 1e6
+            sample["documents"] = int(values.get("Documents", 0))
+            sample["nodes"] = int(values.get("Nodes", 0))
+        except Exception:
+            pass  # not a chrome driver, or the page is mid-navigation
+        sample = {key: round(value, 1) if isinstance(value, float) else value for key, value in sample.items()}
+        self.last_sample = sample
+        return sample
+
+    def check(self):
+        """
+        None, "recycle_tab" or "restart" for the current sample
+        """
+        sample = self.sample()
+        rss, heap, documents = sample["rss_mb"], sample["heap_mb"], sample["documents"]
+
+        action = None
+        if rss is not None and rss > self.browser_limit_mb:
+            # recycling the tab already failed to bring the browser back under budget
+            if self.recycled and self.restarts < self.max_restarts:
+                action = "restart"
+                self.restarts += 1
+            else:
+                action = "recycle_tab"
+        elif (heap is not None and heap > self.tab_limit_mb) or (documents or 0) > MAX_DOCUMENTS:
+            action = "recycle_tab"
+
+        self.recycled = action == "recycle_tab"
+        return action
+
+    def reset(self, driver):
+        """
+        after a browser restart: new driver, devtools domains need enabling again
+        """
+        self.driver = driver
+        self.metrics_handle = None
+        self.recycled = False
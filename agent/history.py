@@ -0,0 +1,144 @@
+# ==============================
+# history.py
+# back / forward navigation for the interactive loop:
+#   - two stacks around the current entry, every move is O(1)
+#   - entries remember the scroll position they were left at
+#   - the most recently left pages stay open as tabs (bounded LRU), going
+#     back to one is a tab switch instead of a reload from the top
+# ==============================
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class HistoryEntry:
+    url: str
+    position: int = 0               # scroll offset when the page was left
+    handle: Optional[str] = None    # window handle while the page is resident
+
+
+class NavigationHistory:
+    """
+    back stack, current entry, forward stack (top = next page)
+    """
+
+    def __init__(self):
+        self.back = []
+        self.forward = []
+        self.current = None
+
+    def push(self, url: str):
+        """
+        a new page after the last one, becomes current
+        """
+        if self.current is not None:
+            self.back.append(self.current)
+        self.current = HistoryEntry(url)
+        return self.current
+
+    def go_back(self):
+        """
+        previous entry (now current), None at the first page
+        """
+        if not self.back:
+            return None
+        self.forward.append(self.current)
+        self.current = self.back.pop()
+        return self.current
+
+    def go_forward(self):
+        """
+        entry we went back from (now current), None when there is none
+        """
+        if not self.forward:
+            return None
+        self.back.append(self.current)
+        self.current = self.forward.pop()
+        return self.current
+
+    def upcoming(self):
+        """
+        urls ahead of the current entry that would need loading, next first
+        """
+        return [entry.url for entry in reversed(self.forward) if entry.handle is None]
+
+    @property
+    def index(self):
+        return len(self.back) + 1
+
+    def __len__(self):
+        return len(self.back) + len(self.forward) + (self.current is not None)
+
+
+class ResidentTabs:
+    """
+    pages recently left, kept open in their tabs
+    Responsibilities:
+    - remember the tab of the page being left
+    - switch back to it (the page keeps its DOM and scroll offset)
+    - close the least recently used tabs past the capacity
+    """
+
+    def __init__(self, driver, capacity: int = 3):
+        self.driver = driver
+        self.capacity = capacity
+        self.entries = OrderedDict()    # handle -> entry, least recently left first
+
+    def keep(self, entry: HistoryEntry):
+        """
+        the page being left stays open in the current tab
+        """
+        entry.handle = self.driver.current_window_handle
+        self.entries[entry.handle] = entry
+        self.entries.move_to_end(entry.handle)
+
+    def holds(self, handle: str):
+        return handle in self.entries
+
+    def restore(self, entry: HistoryEntry):
+        """
+        switch to the entry's tab, False when it is not resident (any more)
+        """
+        if entry.handle is None or entry.handle not in self.entries:
+            entry.handle = None
+            return False
+        del self.entries[entry.handle]    # active again, not evictable
+        try:
+            self.driver.switch_to.window(entry.handle)
+        except Exception:
+            entry.handle = None
+            return False    # tab crashed, the caller reloads the page
+        return True
+
+    def open_blank(self):
+        """
+        new foreground tab for a page that is not resident, the resident one
+        we are leaving keeps its tab
+        """
+        handle = self.driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"]
+        self.driver.switch_to.window(handle)
+        return handle
+
+    def trim(self, capacity: int = None):
+        """
+        close least recently used tabs until at most capacity are resident
+        """
+        capacity = self.capacity if capacity is None else capacity
+        while len(self.entries) > capacity:
+            handle, entry = self.entries.popitem(last=False)
+            entry.handle = None
+            try:
+                self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": handle})
+            except Exception:
+                pass
+
+    def reset(self, driver):
+        """
+        after a browser restart every resident tab is gone
+        """
+        for entry in self.entries.values():
+            entry.handle = None
+        self.entries.clear()
+        self.driver = driver
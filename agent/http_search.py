@@ -0,0 +1,213 @@
+# ==============================
+# http_search.py
+# browserless search backend:
+#   - fetch result pages over pooled keep-alive connections
+#   - parse result links with the stdlib html parser
+#   - same filtering rules as the selenium search path
+# ==============================
+
+import gzip
+import http.client
+import threading
+import time
+import zlib
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+from agent.search import SEARCH_ENGINES, is_result_link, search_url
+
+
+# tags that never get a closing tag, they must not go on the parser stack
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "param", "source", "track", "wbr"}
+
+
+class ConnectionPool:
+    """
+    one keep-alive connection per (scheme, host), reused across searches
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def get(self, scheme: str, host: str):
+        key = (scheme, host)
+        with self.lock:
+            conn = self.connections.get(key)
+            if conn is None:
+                cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                conn = cls(host, timeout=self.timeout)
+                self.connections[key] = conn
+            return conn
+
+    def drop(self, scheme: str, host: str):
+        with self.lock:
+            conn = self.connections.pop((scheme, host), None)
+        if conn is not None:
+            conn.close()
+
+    def fetch(self, url: str, headers: dict):
+        """
+        GET a url, retrying once on a stale keep-alive connection
+        returns (status, decoded body text)
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        for attempt in (1, 2):
+            conn = self.get(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # server closed the idle connection, reconnect once
+                self.drop(parts.scheme, parts.netloc)
+                if attempt == 2:
+                    raise
+
+        encoding = response.getheader("Content-Encoding", "")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.status, body.decode(charset, errors="replace")
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections.values():
+                conn.close()
+            self.connections.clear()
+
+
+class ResultParser(HTMLParser):
+    """
+    collects hrefs matching a simple descendant selector (eg "article h2 a")
+    when link_is_parent is set, the href is taken from the matched tag's parent
+    """
+
+    def __init__(self, selector: str, link_is_parent: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.selector = selector.split()
+        self.link_is_parent = link_is_parent
+        self.stack = []     # (tag, attrs) of open elements
+        self.hrefs = []
+
+    def matches(self, tag: str):
+        """
+        last selector part is this tag, the rest appear in order among ancestors
+        """
+        if tag != self.selector[-1]:
+            return False
+        wanted = self.selector[:-1]
+        for open_tag, _ in self.stack:
+            if wanted and open_tag == wanted[0]:
+                wanted = wanted[1:]
+        return not wanted
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.matches(tag):
+            if self.link_is_parent:
+                href = self.stack[-1][1].get("href") if self.stack else None
+            else:
+                href = attrs.get("href")
+            if href:
+                self.hrefs.append(href)
+
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, attrs))
+
+    def handle_endtag(self, tag):
+        # pop back to the matching open tag, tolerating unclosed <p>/<li> etc
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                return
+
+
+def unwrap_redirect(href: str, base_url: str, redirect_param):
+    """
+    resolve relative hrefs and unwrap engine redirect links (/l/?uddg=..., /url?q=...)
+    """
+    href = urljoin(base_url, href)
+    if redirect_param:
+        target = parse_qs(urlsplit(href).query).get(redirect_param)
+        if target:
+            return target[0]
+    return href
+
+
+class HttpSearchBackend:
+    """
+    lightweight search without a browser
+    Responsibilities:
+    - fetch engine result html over pooled connections
+    - parse + filter links exactly like the selenium path
+    - report failure (empty list) so the caller can fall back to selenium
+    """
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    }
+
+    def __init__(self, engines=None, timeout: float = 5.0):
+        self.engines = engines or SEARCH_ENGINES
+        self.pool = ConnectionPool(timeout)
+
+    def search_engine(self, name: str, query: str, max_results: int = 5):
+        """
+        fetch + parse one engine, [] when blocked or nothing parsed
+        """
+        engine = self.engines[name]
+        http_engine = engine.get("http")
+        if not http_engine:
+            return []
+
+        url = search_url(http_engine, query)
+        status, html = self.pool.fetch(url, self.HEADERS)
+        if status != 200:
+            print(f"[WARNING] {name} returned HTTP {status}")
+            return []
+
+        parser = ResultParser(http_engine["selector"], engine["link_is_parent"])
+        parser.feed(html)
+
+        links = []
+        for href in parser.hrefs:
+            href = unwrap_redirect(href, url, http_engine.get("redirect_param"))
+            if is_result_link(engine, href) and href not in links:
+                links.append(href)
+            if len(links) >= max_results:
+                break
+        return links
+
+    def search(self, query: str, max_results: int = 5, order=None):
+        """
+        try engines in order, returns (engine name, links) or (None, [])
+        """
+        for name in order or list(self.engines):
+            start = time.time()
+            try:
+                links = self.search_engine(name, query, max_results)
+            except Exception as e:
+                print(f"[ERROR] HTTP search on {name} failed: {e}")
+                continue
+            if links:
+                print(f"[SUCCESS] Found {len(links)} valid links from {name} over HTTP in {time.time() - start:.2f}s")
+                return name, links
+            print(f"[WARNING] No valid links parsed from {name} over HTTP")
+        return None, []
+
+    def close(self):
+        self.pool.close()
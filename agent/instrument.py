@@ -0,0 +1,240 @@
+# ==============================
+# instrument.py
+# timers and counters around the hot paths (scroll round trips, navigation,
+# search waits, dashboard rendering, pacing):
+#   - off by default, a disabled span is one global lookup + a shared nullcontext
+#   - log-bucketed histograms, fixed memory however long the session runs
+#   - per-visit and per-session p50 / p95 / p99
+#   - export as JSON, optionally as a Chrome trace-event file
+#     (chrome://tracing, https://ui.perfetto.dev)
+#
+# usage:
+#   instrument.enable(trace=True)
+#   with instrument.span("navigate"):
+#       driver.get(url)
+#   instrument.export("profile.json", "trace.json")
+# ==============================
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+_NULL_SPAN = nullcontext()
+_active = None      # Instruments while enabled
+
+
+class Histogram:
+    """
+    durations in log buckets (BUCKETS_PER_OCTAVE per doubling, ~9% resolution)
+    """
+    BUCKETS_PER_OCTAVE = 8
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        micros = max(seconds * 1e6, 1.0)
+        self.buckets[int(math.log2(micros) * self.BUCKETS_PER_OCTAVE)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float):
+        """
+        seconds below which p (0..1) of the durations fall, bucket midpoint
+        """
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 0.5) / self.BUCKETS_PER_OCTAVE) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Instruments:
+    """
+    collects spans and counters from every thread
+    Responsibilities:
+    - session histograms per span name, plus one set per visit (per thread)
+    - counters
+    - optional trace events, capped at max_events
+    """
+
+    def __init__(self, trace: bool = False, max_events: int = 500_000, clock=time.perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.lock = threading.Lock()
+        self.local = threading.local()      # visit in progress on this thread
+        self.session = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.visits = []                    # finished visits: url + span summaries
+        self.events = [] if trace else None
+        self.max_events = max_events
+        self.dropped_events = 0
+
+    @contextmanager
+    def span(self, name: str):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, start, self.clock())
+
+    def record(self, name: str, start: float, end: float):
+        seconds = end - start
+        visit = getattr(self.local, "visit", None)
+        if visit is not None:
+            visit["spans"][name].add(seconds)   # only this thread touches it
+        with self.lock:
+            self.session[name].add(seconds)
+            if self.events is not None:
+                if len(self.events) < self.max_events:
+                    self.events.append((name, start, seconds, threading.get_ident()))
+                else:
+                    self.dropped_events += 1
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counters[name] += n
+
+    def begin_visit(self, url: str, started_at: float = None):
+        """
+        spans on this thread count towards the visit until end_visit
+        started_at: the visit record's wall clock start, to join the two
+        """
+        started_at = time.time() if started_at is None else started_at
+        self.local.visit = {"url": url, "started_at": round(started_at, 3), "spans": defaultdict(Histogram)}
+
+    def end_visit(self):
+        visit = getattr(self.local, "visit", None)
+        if visit is None:
+            return
+        self.local.visit = None
+        entry = dict(visit, spans={name: h.summary() for name, h in sorted(visit["spans"].items())})
+        with self.lock:
+            self.visits.append(entry)
+
+    def report(self):
+        """
+        everything as one JSON-ready dict
+        """
+        with self.lock:
+            return {
+                "elapsed_s": round(self.clock() - self.origin, 3),
+                "spans": {name: h.summary() for name, h in sorted(self.session.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "visits": list(self.visits),
+            }
+
+    def trace_events(self):
+        """
+        Chrome trace-event format, complete ("X") events in microseconds
+        """
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events or ())
+        return {
+            "traceEvents": [
+                {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                 "ts": round((start - self.origin) * 1e6, 1), "dur": round(seconds * 1e6, 1)}
+                for name, start, seconds, tid in events
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self.dropped_events},
+        }
+
+
+def enable(trace: bool = False, **kwargs):
+    """
+    start collecting (process wide), returns the Instruments
+    """
+    global _active
+    _active = Instruments(trace=trace, **kwargs)
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    return _active
+
+
+def span(name: str):
+    """
+    context manager timing a block, a shared no-op while disabled
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _active.span(name)
+
+
+def count(name: str, n: int = 1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+def begin_visit(url: str, started_at: float = None):
+    if _active is not None:
+        _active.begin_visit(url, started_at)
+
+
+def end_visit():
+    if _active is not None:
+        _active.end_visit()
+
+
+def print_report(report: dict, stream=None):
+    """
+    per-span table of the session histograms
+    """
+    stream = stream or sys.stderr
+    print(f"[PROFILE] {report['elapsed_s']:.1f}s, {len(report['visits'])} visits", file=stream)
+    print(f"  {'span':<24}{'count':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+          file=stream)
+    for name, s in report["spans"].items():
+        print(f"  {name:<24}{s['count']:>8}{s['total_ms'] / 1000:>10.2f}{s['p50_ms']:>10.1f}"
+              f"{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}", file=stream)
+    for name, value in report["counters"].items():
+        print(f"  {name:<24}{value:>8}  (count)", file=stream)
+
+
+def export(json_path: str = None, trace_path: str = None, stream=None):
+    """
+    print the session table and write the JSON report / trace file
+    """
+    if _active is None:
+        return
+    report = _active.report()
+    print_report(report, stream)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if trace_path and _active.events is not None:
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(_active.trace_events(), f)
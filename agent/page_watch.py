@@ -0,0 +1,161 @@
+# ==============================
+# page_watch.py
+# in-page end-of-page detector:
+#   - finds the element that really scrolls (document or an inner container)
+#   - ResizeObserver / MutationObserver track its height, scroll events track
+#     the position, so python never has to query geometry
+#   - at the bottom it waits a bounded time for lazy content before declaring
+#     the page done, infinite feeds are capped by a number of extensions
+#   - optional push events via the window.assaPageEvent devtools binding
+# ==============================
+
+import json
+
+
+# installs window.__assaWatch, arguments: lazy wait (ms), max height extensions
+WATCH_SCRIPT = """
+var lazyWait = arguments[0], maxExtensions = arguments[1];
+if (window.__assaWatch) { return true; }
+if (!document.body) { return false; }
+
+var w = window.__assaWatch = {el: null, isRoot: true, height: 0, atBottom: false,
+                              done: false, extensions: 0, timer: null, observers: []};
+
+function isRootEl(el) {
+    return el === document.scrollingElement || el === document.documentElement || el === document.body;
+}
+function viewportOf(el) { return isRootEl(el) ? window.innerHeight : el.clientHeight; }
+w.pos = function () { return w.isRoot ? window.pageYOffset : w.el.scrollTop; };
+w.scroll = function (px) { if (w.isRoot) { window.scrollBy(0, px); } else { w.el.scrollTop += px; } };
+
+function findScroller() {
+    var root = document.scrollingElement || document.documentElement;
+    if (root.scrollHeight > window.innerHeight + 10) { return root; }
+    // app-style layouts scroll an inner container instead of the document
+    var best = null, bestHeight = 0;
+    var all = document.body.getElementsByTagName('*');
+    for (var i = 0; i < all.length && i < 5000; i++) {
+        var el = all[i];
+        if (el.clientHeight < 100 || el.scrollHeight <= el.clientHeight + 10) { continue; }
+        var overflow = getComputedStyle(el).overflowY;
+        if ((overflow === 'auto' || overflow === 'scroll') && el.scrollHeight > bestHeight) {
+            best = el;
+            bestHeight = el.scrollHeight;
+        }
+    }
+    return best || root;
+}
+
+function notify(type) {
+    if (window.assaPageEvent) { window.assaPageEvent(JSON.stringify({type: type, height: w.height})); }
+}
+
+function check() {
+    w.atBottom = w.pos() + viewportOf(w.el) >= w.height - 10;
+    if (!w.atBottom) {
+        clearTimeout(w.timer);
+        w.timer = null;
+        return;
+    }
+    if (w.done || w.timer) { return; }
+    if (w.extensions >= maxExtensions) {
+        w.done = true;   // endless feed, stop after maxExtensions loads
+        notify('done');
+        return;
+    }
+    // at the bottom: give lazy loaders lazyWait ms to grow the page
+    var heightAtBottom = w.height;
+    w.timer = setTimeout(function () {
+        w.timer = null;
+        if (!w.atBottom || w.height !== heightAtBottom) { return; }
+        var other = findScroller();
+        if (other !== w.el && other.scrollHeight > viewportOf(other) + 10) {
+            attach(other);   // content moved into another scroller
+            return;
+        }
+        w.done = true;
+        notify('done');
+    }, lazyWait);
+}
+
+var pending = false;
+function measure() {
+    if (pending) { return; }
+    pending = true;
+    window.requestAnimationFrame(function () {
+        pending = false;
+        var h = w.el.scrollHeight;
+        if (h > w.height + 1) {
+            if (w.height) { w.extensions += 1; }
+            w.height = h;
+            w.done = false;
+            notify('height');
+        } else {
+            w.height = h;
+        }
+        check();
+    });
+}
+
+function attach(el) {
+    w.observers.forEach(function (o) { o.disconnect(); });
+    if (w.el) { (w.isRoot ? window : w.el).removeEventListener('scroll', check); }
+
+    w.el = el;
+    w.isRoot = isRootEl(el);
+    w.height = el.scrollHeight;
+    w.done = false;
+
+    var target = w.isRoot ? document.body : el;
+    var resize = new ResizeObserver(measure);
+    resize.observe(target);
+    if (w.isRoot) { resize.observe(document.documentElement); }
+    var mutation = new MutationObserver(measure);
+    mutation.observe(target, {childList: true, subtree: true});
+    w.observers = [resize, mutation];
+
+    (w.isRoot ? window : el).addEventListener('scroll', check, {passive: true});
+    check();
+}
+
+w.check = check;
+attach(findScroller());
+return true;
+"""
+
+# one round trip per step: scroll the watched element using cached geometry
+# returns null until the watcher is installed, else [position, height, done, atBottom]
+STEP_SCRIPT = """
+var w = window.__assaWatch;
+if (!w) { return null; }
+if (w.done) { return [w.pos(), w.height, true, true]; }
+w.scroll(arguments[0]);
+return [w.pos(), w.height, false, w.atBottom];
+"""
+
+# a page shown again (resident tab): forget that it was done, the bottom gets a
+# fresh lazy wait instead of ending the visit straight away
+REARM_SCRIPT = """
+var w = window.__assaWatch;
+if (!w) { return false; }
+clearTimeout(w.timer);
+w.timer = null;
+w.done = false;
+w.check();
+return true;
+"""
+
+# read-only state, same shape as STEP_SCRIPT
+POLL_SCRIPT = """
+var w = window.__assaWatch;
+if (!w) { return null; }
+return [w.pos(), w.height, w.done, w.atBottom];
+"""
+
+
+def evaluate_expression(script: str, *args):
+    """
+    wrap a webdriver-style script (using arguments[i]) for Runtime.evaluate,
+    arguments are passed as JSON (true / null / unicode strings stay valid JS)
+    """
+    return f"(function () {{{script}}}).apply(null, {json.dumps(list(args))})"
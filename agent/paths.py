@@ -0,0 +1,22 @@
+# ==============================
+# paths.py
+# where assa keeps its local state (stats, caches, ...)
+# ==============================
+
+import os
+
+
+def assa_home():
+    """
+    state directory, ASSA_HOME env var or ~/.assa (created on first use)
+    """
+    path = os.environ.get("ASSA_HOME") or os.path.join(os.path.expanduser("~"), ".assa")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def state_file(name: str):
+    """
+    full path of a file inside the state directory
+    """
+    return os.path.join(assa_home(), name)
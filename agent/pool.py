@@ -0,0 +1,227 @@
+# ==============================
+# pool.py
+# parallel browsing:
+#   - N headless chrome workers
+#   - shared url queue
+#   - crashed or hung browsers get recycled (one supervisor per worker)
+#   - results merged into one tracker
+# ==============================
+
+import queue
+import threading
+import time
+
+from agent import instrument
+from agent.blocker import attach_blocker
+from agent.browser import create_driver
+from agent.extract import PageExtractor
+from agent.scroller import Scroller
+from agent.supervisor import DRIVER_ERRORS, DriverSupervisor
+
+
+class PoolWorker:
+    """
+    one headless browser + scroller, pulling urls from the shared queue
+    """
+
+    def __init__(self, worker_id: int, pool):
+        self.worker_id = worker_id
+        self.pool = pool
+        self.driver = None
+        self.supervisor = None   # deadlines + hang watchdog for self.driver
+        self.blocker = None
+        self.thread = None
+
+        # state shown on the dashboard
+        self.url = None
+        self.status = "IDLE"
+        self.visited = 0
+        self.restarts = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def ensure_driver(self):
+        """
+        launch browser on first use or after a crash
+        """
+        if self.driver is None:
+            self.status = "STARTING"
+            self.driver = create_driver(headless=self.pool.headless)
+            # restarts are the worker's own (recycle), the supervisor only watches
+            self.supervisor = DriverSupervisor(self.driver, factory=None, max_restarts=0)
+            if self.pool.block_rules is not None:
+                self.blocker = attach_blocker(self.driver, self.pool.block_rules)
+        return self.driver
+
+    def recycle(self):
+        """
+        throw away a crashed browser, next url gets a fresh one
+        """
+        self.close()
+        self.restarts += 1
+
+    def close(self):
+        if self.supervisor is not None:
+            self.supervisor.close()
+            self.supervisor = None
+        if self.blocker is not None:
+            self.blocker.close()
+            self.blocker = None
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def run(self):
+        while not self.pool.stop_event.is_set():
+            try:
+                url, attempt = self.pool.links.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                self.visit(url)
+            except DRIVER_ERRORS as e:
+                # crash, or a hang the watchdog killed the browser for
+                reason = self.supervisor.failure_reason(e) if self.supervisor else f"crash:{type(e).__name__}"
+                print(f"[WARNING] Worker {self.worker_id} browser failed on {url} ({reason})")
+                self.pool.tracker.add_record(url, 0.0, engine=self.pool.link_engines.get(url),
+                                             query=self.pool.link_queries.get(url), error=reason)
+                self.recycle()
+                # give the url one more chance on whichever worker is free
+                if attempt < self.pool.max_attempts and not self.pool.stop_event.is_set():
+                    self.pool.links.put((url, attempt + 1))
+                else:
+                    self.pool.failed.append(url)
+                if self.restarts > self.pool.max_restarts:
+                    print(f"[ERROR] Worker {self.worker_id} exceeded {self.pool.max_restarts} restarts, stopping")
+                    break
+            finally:
+                self.pool.links.task_done()
+
+        self.url = None
+        self.status = "DONE"
+        self.close()
+
+    def visit(self, url: str):
+        driver = self.ensure_driver()
+        supervisor = self.supervisor
+        tracker = self.pool.tracker
+        self.url = url
+        self.status = "LOADING"
+        visit = tracker.new_visit(url, self.pool.link_engines.get(url), self.pool.link_queries.get(url))
+        if not supervisor.load(url):
+            # page-load deadline (browser.PAGE_LOAD_TIMEOUT): keep what loaded
+            tracker.mark_failure("page_load_timeout", visit)
+        tracker.mark_loaded(visit)
+
+        self.status = "SCROLLING"
+        extractor = None
+        if self.pool.content is not None:
+            extractor = PageExtractor.for_visit(self.pool.content, visit, every=self.pool.extract_every)
+        scroller = Scroller(driver, self.pool.speed, self.pool.scroll_mode, extractor=extractor)
+        while not self.pool.stop_event.is_set():
+            if self.pool.max_site_time and tracker.clock() - visit.started > self.pool.max_site_time:
+                break
+            with supervisor.guard("scroll"):
+                more = scroller.scroll_step(wait=False)
+            if not more:
+                tracker.mark_end(visit)
+                break
+            tracker.mark_scroll(scroller.moved, visit)
+            # wakes immediately when the pool is stopped
+            with instrument.span("pace.wait"):
+                self.pool.stop_event.wait(scroller.tick_interval())
+
+        if extractor is not None:
+            with supervisor.guard("extract"):
+                extractor.finish(driver)
+        if self.blocker is not None:
+            tracker.mark_requests(self.blocker.take_counts(), visit)
+        tracker.end_site(visit)
+        self.visited += 1
+
+
+class BrowserPool:
+    """
+    pool of headless browsers visiting links in parallel
+    Responsibilities:
+    - start / recycle workers
+    - feed links through a shared queue
+    - report per-worker status to the dashboard
+    - shut everything down cleanly
+    """
+
+    def __init__(self, tracker, dashboard, workers: int = 4, speed: str = "fast",
+                 scroll_mode: str = "step", headless: bool = True,
+                 max_site_time: float = 0, max_restarts: int = 3, max_attempts: int = 2,
+                 block_rules=None, content=None, extract_every: int = 10):
+        self.tracker = tracker
+        self.dashboard = dashboard
+        self.size = max(1, workers)
+        self.speed = speed
+        self.scroll_mode = scroll_mode
+        self.headless = headless
+        self.max_site_time = max_site_time   # 0 = scroll until end of page
+        self.max_restarts = max_restarts
+        self.max_attempts = max_attempts
+        self.block_rules = block_rules       # BlockRules or None
+        self.content = content               # extract.ContentWriter or None
+        self.extract_every = extract_every
+
+        self.links = queue.Queue()
+        self.stop_event = threading.Event()
+        self.workers = []
+        self.link_engines = {}
+        self.link_queries = {}
+        self.failed = []   # urls that failed on every attempt
+
+    def run(self, links, controls=None, link_engines=None, link_queries=None):
+        """
+        visit all links using the pool, blocks until done or stopped
+        controls: optional ControlQueue, a quit command stops the pool
+        link_engines: optional {url: search engine} for the tracker
+        link_queries: optional {url: search query} for the tracker
+        """
+        self.link_engines = link_engines or {}
+        self.link_queries = link_queries or {}
+        for link in links:
+            self.links.put((link, 1))
+
+        self.workers = [PoolWorker(i, self) for i in range(1, min(self.size, len(links)) + 1)]
+        for worker in self.workers:
+            worker.start()
+
+        while any(w.thread.is_alive() for w in self.workers):
+            self.dashboard.show_workers(self.worker_rows(), self.links.qsize())
+            # refresh the table every 0.2s, or right away on a command
+            command = controls.wait(0.2) if controls else time.sleep(0.2)
+            if command is not None:
+                controls.handled(command)
+                if command.name == "quit":
+                    self.stop()
+
+        self.dashboard.show_workers(self.worker_rows(), self.links.qsize())
+
+    def worker_rows(self):
+        return [(w.worker_id, w.url, w.status, w.visited, w.restarts) for w in self.workers]
+
+    def stop(self):
+        """
+        ask workers to finish their current step and exit
+        """
+        self.stop_event.set()
+
+    def shutdown(self):
+        """
+        stop workers and close every browser
+        """
+        self.stop()
+        for worker in self.workers:
+            if worker.thread is not None:
+                worker.thread.join(timeout=5)
+            worker.close()
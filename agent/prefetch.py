@@ -0,0 +1,153 @@
+# ==============================
+# prefetch.py
+# pipelined navigation:
+#   - the next link(s) load in background tabs while the current page scrolls
+#   - links past the pipeline depth (or over the memory limit) only get
+#     dns-prefetch / preconnect hints
+#   - moving on switches to the warm tab instead of calling driver.get
+# ==============================
+
+from urllib.parse import urlsplit
+
+from agent.blocker import attach_blocker
+from agent.governor import browser_rss_mb
+
+
+# adds dns-prefetch + preconnect hints for arguments[0] (an origin) to the current page
+PRECONNECT_SCRIPT = """
+var origin = arguments[0];
+if (document.head.querySelector('link[data-assa-preconnect="' + origin + '"]')) { return; }
+['dns-prefetch', 'preconnect'].forEach(function (rel) {
+    var link = document.createElement('link');
+    link.rel = rel;
+    link.href = origin;
+    link.setAttribute('data-assa-preconnect', origin);
+    document.head.appendChild(link);
+});
+"""
+
+
+class TabPrefetcher:
+    """
+    keeps upcoming links loading in background tabs
+    Responsibilities:
+    - open up to `depth` background tabs for the next links
+    - stop opening tabs once the browser uses more than memory_limit_mb
+    - hand over a warm tab when the agent moves on
+    - with block_rules, intercept requests of a tab before it starts loading
+    """
+
+    def __init__(self, driver, depth: int = 1, memory_limit_mb: float = 1500, block_rules=None):
+        self.driver = driver
+        self.depth = depth
+        self.memory_limit_mb = memory_limit_mb
+        self.block_rules = block_rules
+        self.tabs = {}       # url -> window handle (== devtools target id)
+        self.blockers = {}   # window handle -> RequestBlocker of that tab
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, upcoming):
+        """
+        make the background tabs match the next `depth` links
+        call after the current page has loaded so it gets the bandwidth first
+        """
+        wanted = list(upcoming[:self.depth])
+        for url in list(self.tabs):
+            if url not in wanted:
+                self.close_tab(self.tabs.pop(url))
+
+        for url in wanted:
+            if url in self.tabs:
+                continue
+            if self.over_memory_limit():
+                self.preconnect(url)
+                continue
+            try:
+                self.tabs[url] = self.open_tab(url)
+            except Exception as e:
+                print(f"[WARNING] Could not prefetch {url}: {e}")
+                self.preconnect(url)
+
+        # one link past the pipeline only gets connection hints
+        for url in upcoming[self.depth:self.depth + 1]:
+            self.preconnect(url)
+
+    def open_tab(self, url: str):
+        """
+        background tab loading url, returns its handle
+        """
+        if self.block_rules is None:
+            return self.driver.execute_cdp_cmd("Target.createTarget", {"url": url, "background": True})["targetId"]
+
+        # start blank so interception is in place before the first request
+        handle = self.driver.execute_cdp_cmd("Target.createTarget",
+                                             {"url": "about:blank", "background": True})["targetId"]
+        blocker = attach_blocker(self.driver, self.block_rules, handle)
+        if blocker is None:
+            self.close_tab(handle)
+            return self.driver.execute_cdp_cmd("Target.createTarget", {"url": url, "background": True})["targetId"]
+        self.blockers[handle] = blocker
+        blocker.navigate(url)
+        return handle
+
+    def activate(self, url: str, close_previous: bool = True):
+        """
+        switch to the prefetched tab for url and close the tab we leave
+        (unless close_previous is False, eg it stays resident for going back)
+        returns False when url was not prefetched (caller falls back to driver.get)
+        """
+        handle = self.tabs.pop(url, None)
+        if handle is None:
+            self.misses += 1
+            return False
+
+        previous = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(handle)
+        except Exception:
+            self.misses += 1
+            return False  # tab crashed or was closed, load it the slow way
+
+        if close_previous:
+            self.close_tab(previous)
+        self.hits += 1
+        return True
+
+    def take_blocker(self, handle: str):
+        """
+        hand the request blocker of an activated tab over to the caller
+        """
+        return self.blockers.pop(handle, None)
+
+    def over_memory_limit(self):
+        if not self.memory_limit_mb:
+            return False
+        rss = browser_rss_mb(self.driver)
+        return rss is not None and rss > self.memory_limit_mb
+
+    def preconnect(self, url: str):
+        parts = urlsplit(url)
+        if not parts.scheme.startswith("http"):
+            return
+        try:
+            self.driver.execute_script(PRECONNECT_SCRIPT, f"{parts.scheme}://{parts.netloc}")
+        except Exception:
+            pass  # hints are best effort
+
+    def close_tab(self, handle: str):
+        blocker = self.blockers.pop(handle, None)
+        if blocker is not None:
+            blocker.close()
+        try:
+            self.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": handle})
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        close every background tab that was never used
+        """
+        for handle in list(self.tabs.values()):
+            self.close_tab(handle)
+        self.tabs.clear()
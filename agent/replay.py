@@ -0,0 +1,356 @@
+# ==============================
+# replay.py
+# record a session, replay it deterministically:
+#   - recording: links, every key command (anchored to the scroll step it
+#     arrived at + its time in the visit), scroll positions per visit and an
+#     MHTML snapshot of each page
+#   - replay: the same links through BrowserAgent.run against the snapshots,
+#     commands come back from the trace instead of the keyboard, a virtual
+#     clock replaces time.sleep / time.time in Scroller and SessionTracker
+#   - speedup 0 runs as fast as the browser allows, 1 is real time
+#
+# trace directory layout:
+#   trace.jsonl         session header, then one line per visit
+#   pages/NNN.mhtml     page snapshots (NNN.html when devtools is unavailable)
+#
+# usage:
+#   python main.py --record "search term"
+#   python -m agent.replay ~/.assa/traces/<timestamp> [--speedup 4] [--record]
+# ==============================
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from agent.controls import KEY_COMMANDS, Command
+from agent.paths import state_file
+
+
+TRACE_VERSION = 1
+
+
+def new_trace_dir():
+    """
+    ~/.assa/traces/<timestamp>, created
+    """
+    path = os.path.join(state_file("traces"), time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(os.path.join(path, "pages"), exist_ok=True)
+    return path
+
+
+def command_key(command):
+    """
+    key that produces the command again (the trace stores keys, not objects)
+    """
+    for key, spec in KEY_COMMANDS.items():
+        if spec == (command.name, command.value):
+            return key
+    return None
+
+
+def save_snapshot(driver, directory: str, index: int):
+    """
+    store the current page, returns the path relative to the trace directory
+    MHTML keeps css / images and does not run scripts; plain html otherwise
+    """
+    try:
+        data = driver.execute_cdp_cmd("Page.captureSnapshot", {"format": "mhtml"})["data"]
+        name = f"pages/{index:03d}.mhtml"
+    except Exception:
+        try:
+            data = driver.page_source
+        except Exception:
+            return None
+        name = f"pages/{index:03d}.html"
+    with open(os.path.join(directory, name), "w", encoding="utf-8", newline="") as f:
+        f.write(data)
+    return name
+
+
+class SessionRecorder:
+    """
+    writes the trace of one interactive session
+    Responsibilities:
+    - header with query, queued links (visiting order), starting speed, scroll mode
+      and the settings that pick code paths (resident tabs, prefetch, blocking)
+    - per visit: scroll positions by step, key commands, snapshot
+    """
+
+    def __init__(self, directory: str = None, clock=time.monotonic, snapshots: bool = True):
+        self.directory = directory or new_trace_dir()
+        os.makedirs(os.path.join(self.directory, "pages"), exist_ok=True)
+        self.path = os.path.join(self.directory, "trace.jsonl")
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.clock = clock
+        self.snapshots = snapshots
+        self.snapshot_of = {}   # url -> snapshot, every url is saved once
+        self.started = None
+        self.visits = 0
+        self.visit = None
+
+    def write(self, record: dict):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def start(self, query: str, links, speed, scroll_mode: str, settings: dict = None):
+        """
+        settings: BrowserAgent arguments the replay must use too, see replay_session
+        """
+        self.started = self.clock()
+        self.write({"type": "session", "version": TRACE_VERSION, "query": query, "links": list(links),
+                    "speed": speed, "scroll_mode": scroll_mode, "settings": settings or {},
+                    "started_at": round(time.time(), 3)})
+
+    def elapsed_ms(self, since: float):
+        return round((self.clock() - since) * 1000)
+
+    def begin_visit(self, url: str):
+        self.visit = {"type": "visit", "index": self.visits, "url": url,
+                      "t": round(self.clock() - (self.started or self.clock()), 3),
+                      "started": self.clock(), "step": 0, "position": None,
+                      "steps": [], "commands": []}
+        self.visits += 1
+
+    def step(self, position: int):
+        """
+        after every scroll step, positions are kept only when they change
+        """
+        visit = self.visit
+        visit["step"] += 1
+        if position != visit["position"]:
+            visit["position"] = position
+            visit["steps"].append([visit["step"], self.elapsed_ms(visit["started"]), position])
+
+    def command(self, command):
+        key = command_key(command)
+        if key is not None and self.visit is not None:
+            self.visit["commands"].append([self.visit["step"], self.elapsed_ms(self.visit["started"]), key])
+
+    def end_visit(self, driver):
+        visit, self.visit = self.visit, None
+        if visit is None:
+            return
+        if self.snapshots and driver is not None and visit["url"] not in self.snapshot_of:
+            snapshot = save_snapshot(driver, self.directory, visit["index"])
+            if snapshot:
+                self.snapshot_of[visit["url"]] = snapshot
+        self.write({"type": "visit", "index": visit["index"], "url": visit["url"], "t": visit["t"],
+                    "end_ms": self.elapsed_ms(visit["started"]), "snapshot": self.snapshot_of.get(visit["url"]),
+                    "steps": visit["steps"], "commands": visit["commands"]})
+
+    def close(self):
+        self.file.close()
+
+
+def load_trace(directory: str):
+    """
+    (header, [visit, ...]) of a recorded trace
+    """
+    header, visits = None, []
+    with open(os.path.join(directory, "trace.jsonl"), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["type"] == "session":
+                header = record
+            elif record["type"] == "visit":
+                visits.append(record)
+    if header is None:
+        raise ValueError(f"{directory} has no session header")
+    return header, visits
+
+
+class VirtualClock:
+    """
+    deterministic time: only advances when the replay waits or sleeps
+    speedup: 0 never really sleeps, otherwise sleeps wait / speedup
+    """
+
+    def __init__(self, start: float = 0.0, speedup: float = 0):
+        self.now = start
+        self.speedup = speedup
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        if seconds and seconds > 0:
+            self.now += seconds
+            if self.speedup:
+                time.sleep(seconds / self.speedup)
+
+    def advance_to(self, moment: float):
+        self.sleep(moment - self.now)
+
+
+class SessionReplay:
+    """
+    stands in for the keyboard and the clock while BrowserAgent.run replays a trace
+    Responsibilities:
+    - recorded links, snapshot urls
+    - ControlQueue interface: recorded commands at the step they arrived at
+    - compare replayed scroll positions with the recorded ones
+    """
+
+    def __init__(self, directory: str, speedup: float = 0):
+        self.directory = directory
+        self.header, self.visits = load_trace(directory)
+        self.query = self.header["query"]
+        self.links = self.header["links"]
+        self.speed = self.header["speed"]
+        self.scroll_mode = self.header["scroll_mode"]
+        self.settings = self.header.get("settings", {})   # older traces have none
+        self.clock = VirtualClock(speedup=speedup)
+        self.snapshots = {}
+        for visit in self.visits:
+            if visit.get("snapshot"):
+                self.snapshots.setdefault(visit["url"], os.path.join(directory, visit["snapshot"]))
+
+        self.visit = None        # recorded visit being replayed
+        self.visit_url = None    # url the replay actually opened for it
+        self.visit_started = 0.0
+        self.pending = []        # its commands not delivered yet
+        self.step_count = 0
+        self.positions = {}      # replayed: step -> position
+        self.results = []        # per-visit comparison
+        self.latencies = []
+
+    def wall_clock(self):
+        """
+        epoch time for the tracker: recording start + virtual time
+        """
+        return self.header["started_at"] + self.clock()
+
+    def url_for(self, link: str):
+        """
+        snapshot file of a link, the live url when none was saved
+        """
+        path = self.snapshots.get(link)
+        return Path(path).resolve().as_uri() if path else link
+
+    # -- session hooks, same calls as SessionRecorder --
+
+    def begin_visit(self, url: str):
+        index = len(self.results)
+        self.visit = self.visits[index] if index < len(self.visits) else None
+        self.visit_url = url
+        if self.visit is not None and url != self.visit["url"]:
+            print(f"[WARNING] Replay diverged at visit {index}: opened {url}, recorded {self.visit['url']}")
+        self.visit_started = self.clock()
+        self.pending = list(self.visit["commands"]) if self.visit else []
+        self.step_count = 0
+        self.positions = {}
+
+    def step(self, position: int):
+        self.step_count += 1
+        self.positions[self.step_count] = position
+
+    def command(self, command):
+        pass    # replayed commands come from the trace already
+
+    def end_visit(self, driver):
+        recorded = self.visit
+        if recorded is None:
+            return  # past the end of the recording
+        drift = 0
+        for step, _, position in recorded["steps"]:
+            if step in self.positions:
+                drift = max(drift, abs(self.positions[step] - position))
+        self.results.append({
+            "url": recorded["url"],
+            "url_matches": self.visit_url == recorded["url"],
+            "recorded_steps": recorded["steps"][-1][0] if recorded["steps"] else 0,
+            "replayed_steps": self.step_count,
+            "max_drift_px": drift,
+            "missed_commands": len(self.pending),
+        })
+        self.visit = None
+
+    # -- ControlQueue interface --
+
+    def wait(self, timeout=None):
+        """
+        the next recorded command once its step is reached, otherwise advance
+        the virtual clock by timeout and return None
+        """
+        if self.visit is None and len(self.results) >= len(self.visits):
+            return Command("quit")  # the recording ended here
+        if self.pending and (self.pending[0][0] <= self.step_count or timeout is None):
+            step, at_ms, key = self.pending.pop(0)
+            self.clock.advance_to(self.visit_started + at_ms / 1000)
+            return Command(*KEY_COMMANDS[key])
+        if timeout is None:
+            return Command("quit")  # paused with nothing left to resume it
+        self.clock.sleep(timeout)
+        return None
+
+    def put(self, name: str, value=None):
+        pass
+
+    def put_key(self, key: str):
+        pass
+
+    def handled(self, command):
+        self.latencies.append(0.0)
+
+    def latency_summary(self):
+        return len(self.latencies), 0.0, 0.0
+
+    def report(self):
+        """
+        print and return the per-visit comparison
+        """
+        print(f"[REPLAY] {len(self.results)} of {len(self.visits)} recorded visits, "
+              f"{self.clock():.1f}s virtual time")
+        for result in self.results:
+            print(f"  {result['url']}: steps {result['replayed_steps']}/{result['recorded_steps']}, "
+                  f"max drift {result['max_drift_px']}px, missed commands {result['missed_commands']}"
+                  + ("" if result["url_matches"] else ", DIFFERENT PAGE"))
+        return self.results
+
+
+def replay_session(directory: str, speedup: float = 0, record: bool = False):
+    """
+    replay a recorded trace through BrowserAgent.run, returns the exit status
+    (0 when every recorded visit and command was replayed on the recorded page)
+    """
+    from agent.agent import BrowserAgent
+    from agent.blocker import BlockRules
+
+    replay = SessionReplay(directory, speedup)
+    recorder = SessionRecorder(clock=replay.clock, snapshots=False) if record else None
+    # same resident tab / prefetch / blocking paths as the recorded session
+    settings = replay.settings
+    block_rules = settings.get("block_rules")
+    agent = BrowserAgent(scroll_mode=replay.scroll_mode, use_cache=False, use_daemon=False,
+                         memory_limit_mb=0, replay=replay, recorder=recorder,
+                         resident_tabs=settings.get("resident_tabs", 3),
+                         prefetch_depth=settings.get("prefetch_depth", 0),
+                         prefetch_memory_mb=settings.get("prefetch_memory_mb", 1500),
+                         block_rules=BlockRules(**block_rules) if block_rules else None)
+    agent.current_speed = replay.speed
+    agent.run(replay.query)
+
+    results = replay.report()
+    if recorder is not None:
+        print(f"[REPLAY] Replayed trace in {recorder.directory}")
+    complete = (len(results) == len(replay.visits)
+                and not any(r["missed_commands"] or not r["url_matches"] for r in results))
+    return 0 if complete else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="replay a recorded assa session")
+    parser.add_argument("trace", help="trace directory (python main.py --record ...)")
+    parser.add_argument("--speedup", type=float, default=0, help="0 = as fast as possible, 1 = real time")
+    parser.add_argument("--record", action="store_true", help="record the replay as a new trace")
+    args = parser.parse_args(argv)
+    return replay_session(args.trace, args.speedup, args.record)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
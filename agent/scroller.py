@@ -1,17 +1,124 @@
 # scroller.py
 # handles scrolling logic
 
-from selenium.webdriver.common.action_chains import ActionChains
+import math
 import time
 
+from agent import instrument
+from agent.page_watch import POLL_SCRIPT, REARM_SCRIPT, STEP_SCRIPT, WATCH_SCRIPT
+
+
+# in-page requestAnimationFrame loop, scrolls the watched element at arguments[0] px/sec
+# needs the page_watch watcher; python only polls its state for position / end of page
+RAF_START_SCRIPT = """
+var rate = arguments[0];
+var w = window.__assaWatch;
+var s = window.__assaRaf;
+if (s && s.running) { s.rate = rate; return; }
+s = window.__assaRaf = {rate: rate, running: true, last: null, carry: 0};
+function tick(ts) {
+    if (!s.running) { return; }
+    if (w.done) { s.running = false; return; }
+    if (s.last !== null) {
+        s.carry += s.rate * (ts - s.last) / 1000;
+        var px = Math.floor(s.carry);
+        if (px > 0) { w.scroll(px); s.carry -= px; }
+    }
+    s.last = ts;
+    window.requestAnimationFrame(tick);
+}
+window.requestAnimationFrame(tick);
+"""
+
+RAF_STOP_SCRIPT = """
+if (window.__assaRaf) { window.__assaRaf.running = false; }
+"""
+
+
+def speed_rate(speed):
+    """
+    px/sec for a preset name ("slow" / "medium" / "fast") or a number
+    raises ValueError for anything else (nan / inf / zero / negative too)
+    """
+    if speed in Scroller.SPEEDS:
+        pixels, delay = Scroller.SPEEDS[speed]
+        return pixels / delay
+    rate = float(speed)
+    if not (math.isfinite(rate) and rate > 0):
+        raise ValueError(f"speed must be positive, got {speed!r}")
+    return rate
+
+
+def speed_label(speed):
+    """
+    short dashboard label: S / M / F for presets, "350px/s" for numbers
+    """
+    if speed in Scroller.SPEEDS:
+        return speed[0].upper()
+    return f"{float(speed):g}px/s"
+
+
+class RateController:
+    """
+    turns a target px/sec into per-tick step sizes
+    - step size comes from the real time elapsed since the last tick, so slow
+      webdriver round trips or heavy pages do not lower the throughput
+    - speed changes ramp with a fixed acceleration instead of jumping
+    """
+    ACCELERATION = 4000.0   # px/sec^2 when changing speed
+    MAX_CATCHUP = 0.25      # never make up for more than this many seconds at once
+    MIN_TICK = 0.008
+    MAX_TICK = 0.05
+
+    def __init__(self, rate: float, clock=time.perf_counter):
+        self.clock = clock
+        self.target = rate
+        self.rate = rate
+        self.carry = 0.0
+        self.last = None
+
+    def set_target(self, rate: float):
+        self.target = rate
+
+    def reset(self):
+        """
+        forget the last tick (after a pause / new page) so time spent idle is not made up
+        """
+        self.last = None
+
+    def interval(self):
+        """
+        seconds between ticks, about one pixel per tick at low speeds
+        """
+        return min(self.MAX_TICK, max(self.MIN_TICK, 1.0 / self.target))
+
+    def next_pixels(self):
+        """
+        whole pixels to scroll on this tick (fractions carry over)
+        """
+        now = self.clock()
+        elapsed = self.interval() if self.last is None else min(now - self.last, self.MAX_CATCHUP)
+        self.last = now
+
+        # ramp towards the target, integrate with the average rate over the tick
+        start_rate = self.rate
+        change = self.target - self.rate
+        limit = self.ACCELERATION * elapsed
+        self.rate += max(-limit, min(limit, change))
+
+        self.carry += (start_rate + self.rate) / 2 * elapsed
+        pixels = int(self.carry)
+        self.carry -= pixels
+        return pixels
+
 
 class Scroller:
     """
     class to handle scrolling actions
     Responsibilities:
-    - scroll by step (pixels, delay)
+    - scroll at a target px/sec (presets or any number)
     - support pause/resume
-    - change speed dynamically
+    - change speed dynamically (smoothly ramped)
     """
     SPEEDS = {
         "slow":   (1, 0.025),   # ~40px/sec, relaxed crawl
@@ -20,14 +127,48 @@ class Scroller:
     }
 
 
-    def __init__(self, driver, speed: str = "slow"):
+    # how often python polls the page in rAF mode
+    RAF_POLL_INTERVAL = 0.1
+    # tick while parked at the bottom waiting for lazy content
+    BOTTOM_POLL_INTERVAL = 0.1
+
+
+    def __init__(self, driver, speed: str = "slow", mode: str = "step", clock=time.perf_counter,
+                 lazy_wait: float = 1.5, max_extensions: int = 50, extractor=None, sleep=time.sleep):
         """
         initialize with driver and default speed
-        speed presets: slow / medium / fast
+        speed presets: slow / medium / fast, or a number in px/sec
+        modes:
+            step - python drives every scroll step (one script call per step)
+            raf  - page runs its own requestAnimationFrame loop, python polls
+        lazy_wait: seconds the page watcher waits at the bottom for more content
+        max_extensions: infinite feeds are done after growing this many times
+        extractor: optional extract.PageExtractor fed after every step
+        clock / sleep: time source and pacing, replays pass a virtual clock
         """
         self.driver = driver
+        self.mode = mode
+        self.lazy_wait = lazy_wait
+        self.max_extensions = max_extensions
+        self.extractor = extractor
+        self.sleep = sleep
+        try:
+            rate = speed_rate(speed)
+        except ValueError:
+            speed, rate = "medium", speed_rate("medium")
         self.speed = speed
-        self.pixels, self.delay = self.SPEEDS.get(speed, self.SPEEDS["medium"])
+        self.rate = rate
+        self.controller = RateController(rate, clock)
+        # nominal step for the target rate (used by legacy start())
+        self.delay = self.controller.interval()
+        self.pixels = max(1, round(rate * self.delay))
+
+        # last known geometry, updated by every step / poll
+        self.position = 0
+        self.page_height = 0
+        self.moved = 0      # pixels moved by the last step / poll
+        self.at_bottom = False   # at the bottom, waiting for lazy content
+        self.raf_running = False
         
 
         #initial 
@@ -38,50 +179,155 @@ class Scroller:
         self.paused = False
 
 
-    def scroll_step(self, paused=False):
+    def scroll_step(self, paused=False, wait=True):
         """
         Perform one scroll step and return True if more scrolling is possible
         Args:
             paused: External pause state to override internal paused state
+            wait: sleep for the step delay afterwards; event-driven callers
+                  pass False and wait tick_interval() on their own queue
         """
         if paused or self.paused:
+            self.stop_raf()  # in-page loop must not keep scrolling while paused
             return True  # stay on current page while paused
-        
-        current_scroll = self.driver.execute_script("return window.pageYOffset")
-        page_height = self.driver.execute_script("return document.body.scrollHeight")
-        window_height = self.driver.execute_script("return window.innerHeight")
-        
-        # check if we've reached the bottom
-        if current_scroll + window_height >= page_height - 10:  # 10px tolerance
-            return False  # reached end of page
-        
-        # perform scroll
-        self.driver.execute_script(f"window.scrollBy(0, {self.pixels});")
-        time.sleep(self.delay)
+
+        if self.mode == "raf":
+            return self._raf_step(wait)
+
+        # step size follows the real time since the last step
+        pixels = self.controller.next_pixels()
+        if pixels == 0:
+            self.moved = 0
+        else:
+            # the in-page watcher owns geometry / end detection, one round trip per step
+            with instrument.span("scroll.step"):
+                result = self.driver.execute_script(STEP_SCRIPT, pixels)
+            if result is None and self.install_watch():
+                with instrument.span("scroll.step"):
+                    result = self.driver.execute_script(STEP_SCRIPT, pixels)
+            instrument.count("scroll.steps")
+            if result is not None:
+                self.update_position(result)
+                self.extract(done=result[2])
+                if result[2]:
+                    return False  # watcher says the page is truly done
+
+        if wait:
+            with instrument.span("pace.sleep"):
+                self.sleep(self.tick_interval())
         return True
-        
+
+    def jump_to(self, position: int):
+        """
+        scroll straight to a saved offset (a page reloaded when going back),
+        not counted as scrolled pixels
+        """
+        if position <= self.position or not self.install_watch():
+            return
+        result = self.driver.execute_script(STEP_SCRIPT, position - self.position)
+        if result is not None:
+            self.update_position(result)
+        self.moved = 0
+
+    def rearm(self, position: int):
+        """
+        continue on a page left earlier and kept open (its tab kept the offset),
+        the watcher's done state from last time does not count
+        """
+        self.position = position
+        self.driver.execute_script(REARM_SCRIPT)
+
+    def install_watch(self):
+        """
+        install the in-page end-of-page watcher, False while the page has no body yet
+        """
+        with instrument.span("scroll.install"):
+            return bool(self.driver.execute_script(WATCH_SCRIPT, int(self.lazy_wait * 1000), self.max_extensions))
+
+    def update_position(self, result):
+        """
+        store geometry from a step / poll result and how far the page moved
+        """
+        previous = self.position
+        self.position, self.page_height, self.at_bottom = result[0], result[1], result[3]
+        self.moved = max(0, self.position - previous)
+
+    def tick_interval(self):
+        """
+        seconds between two scroll_step calls for the current speed / mode
+        """
+        if self.mode == "raf":
+            return max(self.controller.interval(), self.RAF_POLL_INTERVAL)
+        if self.at_bottom:
+            # nothing to scroll until the watcher sees new content or gives up
+            return max(self.controller.interval(), self.BOTTOM_POLL_INTERVAL)
+        return self.controller.interval()
+
+    def _raf_step(self, wait=True):
+        """
+        rAF mode - the page scrolls itself, python only polls the loop state
+        """
+        if not self.raf_running:
+            if not self.install_watch():
+                return True  # no body yet, try again next step
+            self.driver.execute_script(RAF_START_SCRIPT, self.rate)
+            self.raf_running = True
+
+        # poll at most every RAF_POLL_INTERVAL, the page keeps scrolling meanwhile
+        if wait:
+            with instrument.span("pace.sleep"):
+                self.sleep(self.tick_interval())
+        with instrument.span("scroll.poll"):
+            result = self.driver.execute_script(POLL_SCRIPT)
+        if result is None:
+            # navigation wiped the page state, restart loop on next step
+            self.raf_running = False
+            return True
+
+        self.update_position(result)
+        at_end = result[2]
+        self.extract(done=at_end)
+        if at_end:
+            self.stop_raf()
+            return False
+        return True
+
+    def extract(self, done=False):
+        """
+        let the content extractor (if any) see the step
+        """
+        if self.extractor is not None:
+            self.extractor.on_step(self.driver, done)
+
+    def stop_raf(self):
+        """
+        stop the in-page rAF loop (no-op if it is not running)
+        """
+        if self.raf_running:
+            try:
+                self.driver.execute_script(RAF_STOP_SCRIPT)
+            except Exception:
+                pass
+            self.raf_running = False
+
     def start(self):
         """
         Legacy method - begin scrolling until end of page (kept for compatibility)
         """
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        current_height = 0
-
-        while current_height < last_height:
+        while True:
             if not self.paused:
-                self.driver.execute_script(f"window.scrollBy(0, {self.pixels});")
-                time.sleep(self.delay)
-                current_height += self.pixels
-                # update last height in case page dynamically loads content
-                last_height = self.driver.execute_script("return document.body.scrollHeight")
+                # same watcher-backed end detection as scroll_step
+                if not self.scroll_step():
+                    break
             else:
-                time.sleep(0.1)  # wait while paused
+                self.sleep(0.1)  # wait while paused
 
     def pause(self):
         """
         pause scrolling
         """
         self.paused = True
+        self.stop_raf()
         
 
     def resume(self):
@@ -89,15 +335,26 @@ class Scroller:
         resume scrolling
         """
         self.paused = False
+        self.controller.reset()
         
 
-    def change_speed(self, speed: str):
+    def change_speed(self, speed):
         """
-        update scroll speed on the fly
+        update scroll speed on the fly (preset name or px/sec number)
         """
-        if speed in self.SPEEDS:
-            self.speed = speed
-            self.pixels, self.delay = self.SPEEDS[speed]
-        else:
+        try:
+            rate = speed_rate(speed)
+        except ValueError:
             print(f"Speed '{speed}' not recognized. Using current speed.")
+            return
 
+        if speed == self.speed:
+            return
+        self.speed = speed
+        self.rate = rate
+        self.controller.set_target(rate)
+        self.delay = self.controller.interval()
+        self.pixels = max(1, round(rate * self.delay))
+        # push new rate into running rAF loop
+        if self.raf_running:
+            self.driver.execute_script(RAF_START_SCRIPT, self.rate)
@@ -0,0 +1,315 @@
+# ==============================
+# search.py
+# racing multi-engine search:
+#   - engine table (urls, selectors, filters)
+#   - all engines load at once in their own tabs
+#   - first full result set wins (or merge under a deadline)
+#   - per-engine latency / success stats drive priority
+# ==============================
+
+import json
+import os
+import time
+from urllib.parse import quote_plus
+
+
+# declarative engine table, url templates can be pointed at local stand-in pages
+# (benchmarks/search_pages.py)
+# selector      - element carrying the title (and the link, unless link_is_parent)
+# result        - enclosing result block, snippet is looked up inside it
+SEARCH_ENGINES = {
+    "duckduckgo": {
+        "url": "https://duckduckgo.com/?q={query}&ia=web",
+        "selector": "article h2 a",
+        "link_is_parent": False,
+        "result": "article",
+        "snippet": "[data-result='snippet']",
+        "exclude": ["duckduckgo.com"],
+        "captcha_check": False,
+        # browserless variant used by the http backend
+        "http": {
+            "url": "https://html.duckduckgo.com/html/?q={query}",
+            "selector": "h2 a",
+            "redirect_param": "uddg",
+        },
+    },
+    "bing": {
+        "url": "https://www.bing.com/search?q={query}",
+        "selector": "h2 a",
+        "link_is_parent": False,
+        "result": "li.b_algo",
+        "snippet": ".b_caption p",
+        "exclude": ["bing.com", "microsoft.com"],
+        "captcha_check": False,
+        "http": {
+            "url": "https://www.bing.com/search?q={query}",
+            "selector": "h2 a",
+            "redirect_param": None,
+        },
+    },
+    "google": {
+        "url": "https://www.google.com/search?q={query}",
+        "selector": "a h3",
+        "link_is_parent": True,   # selector hits the h3, href lives on the parent <a>
+        "result": "div.g",
+        "snippet": "[data-sncf], .VwiC3b",
+        "exclude": ["google.com"],
+        "captcha_check": True,
+        "http": {
+            "url": "https://www.google.com/search?q={query}&gbv=1",
+            "selector": "a h3",
+            "redirect_param": "q",
+        },
+    },
+}
+
+
+# visited when every engine failed (also the fast demo mode)
+DEMO_LINKS = [
+    "https://news.ycombinator.com",
+    "https://www.bbc.com/news",
+    "https://www.reddit.com",
+    "https://stackoverflow.com",
+    "https://www.wikipedia.org"
+]
+
+
+def search_url(engine: dict, query: str):
+    return engine["url"].format(query=quote_plus(query))
+
+
+def is_result_link(engine: dict, href):
+    """
+    same filtering rules as the original search_* methods
+    """
+    if not href or not href.startswith("http"):
+        return False
+    return not any(domain in href for domain in engine["exclude"])
+
+
+def has_captcha(page_source: str):
+    page_source = page_source.lower()
+    return "unusual traffic" in page_source or "captcha" in page_source
+
+
+# every candidate result in one round trip: [{href, title, snippet}, ...]
+# arguments: selector, link_is_parent, result block selector, snippet selector
+EXTRACT_SCRIPT = """
+var selector = arguments[0], linkIsParent = arguments[1], block = arguments[2], snippet = arguments[3];
+var out = [];
+document.querySelectorAll(selector).forEach(function (el) {
+    var link = linkIsParent ? el.parentElement : el;
+    if (!link || !link.href) { return; }
+    var text = '';
+    var container = block ? el.closest(block) : null;
+    var node = container && snippet ? container.querySelector(snippet) : null;
+    if (node) { text = node.textContent.trim().slice(0, 300); }
+    out.push({href: link.href, title: el.textContent.trim(), snippet: text});
+});
+return out;
+"""
+
+
+def extract_results(driver, engine: dict, max_results: int = 5):
+    """
+    result dicts (href, title, snippet) for an engine from the currently loaded
+    page, one script call however many results there are
+    """
+    try:
+        candidates = driver.execute_script(EXTRACT_SCRIPT, engine["selector"], engine["link_is_parent"],
+                                           engine.get("result"), engine.get("snippet")) or []
+    except Exception:
+        return []
+
+    results, seen = [], set()
+    for result in candidates:
+        href = result["href"]
+        if is_result_link(engine, href) and href not in seen:
+            seen.add(href)
+            results.append(result)
+            if len(results) >= max_results:
+                break
+    return results
+
+
+def extract_links(driver, engine: dict, max_results: int = 5):
+    """
+    pull result links for an engine out of the currently loaded page
+    """
+    return [result["href"] for result in extract_results(driver, engine, max_results)]
+
+
+class EngineStats:
+    """
+    tracks latency / success rate per engine and orders engines by them
+    Responsibilities:
+    - record each engine attempt (ok/failed, latency)
+    - rank engines: fast and reliable first
+    - optionally persist between runs
+    """
+    # weight of the newest latency sample in the moving average
+    ALPHA = 0.3
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stats = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError):
+                self.stats = {}
+
+    def record(self, name: str, ok: bool, latency: float):
+        s = self.stats.setdefault(name, {"attempts": 0, "successes": 0, "latency": None})
+        s["attempts"] += 1
+        if ok:
+            s["successes"] += 1
+            if s["latency"] is None:
+                s["latency"] = latency
+            else:
+                s["latency"] = self.ALPHA * latency + (1 - self.ALPHA) * s["latency"]
+
+    def success_rate(self, name: str):
+        s = self.stats.get(name)
+        if not s or not s["attempts"]:
+            return 1.0  # unknown engines get the benefit of the doubt
+        return s["successes"] / s["attempts"]
+
+    def score(self, name: str):
+        """
+        expected seconds per successful search (lower is better)
+        """
+        s = self.stats.get(name)
+        latency = s["latency"] if s and s["latency"] is not None else 1.0
+        return latency / max(self.success_rate(name), 0.05)
+
+    def ordered(self, names):
+        # stable sort keeps table order for engines with equal scores
+        return sorted(names, key=self.score)
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.stats, f)
+        except OSError as e:
+            print(f"[WARNING] Could not save engine stats: {e}")
+
+
+class SearchRacer:
+    """
+    runs every engine at once in separate tabs of one browser
+    Responsibilities:
+    - open one tab per engine (navigation runs in parallel inside chrome)
+    - poll tabs until results show up or the deadline passes
+    - return first good result set, or merged + deduped results
+    """
+    # how long to sleep between polling rounds
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, driver, engines=None, stats=None):
+        self.driver = driver
+        self.engines = engines or SEARCH_ENGINES
+        self.stats = stats or EngineStats()
+        self.last_engine = None   # engine that won the last race ("merge" when merged)
+
+    def open_tabs(self, query: str):
+        """
+        open one background tab per engine, returns {handle: engine name}
+        """
+        tabs = {}
+        for name in self.stats.ordered(list(self.engines)):
+            before = set(self.driver.window_handles)
+            # window.open returns immediately, so all engines load concurrently
+            self.driver.execute_script("window.open(arguments[0], '_blank');", search_url(self.engines[name], query))
+            new = set(self.driver.window_handles) - before
+            if new:
+                tabs[new.pop()] = name
+        return tabs
+
+    def race(self, query: str, mode: str = "first", deadline: float = 8.0, max_results: int = 5):
+        """
+        mode "first": return the first engine that yields max_results links; a
+                      shorter list (page still loading) only wins at the deadline
+        mode "merge": collect every engine until deadline, merge + dedupe by priority
+        """
+        original = self.driver.current_window_handle
+        start = time.time()
+        tabs = self.open_tabs(query)
+        pending = dict(tabs)
+        found = {}
+
+        try:
+            while pending and time.time() - start < deadline:
+                for handle, name in list(pending.items()):
+                    engine = self.engines[name]
+                    self.driver.switch_to.window(handle)
+
+                    if engine["captcha_check"] and has_captcha(self.driver.page_source):
+                        print(f"[WARNING] {name} CAPTCHA detected, dropping it from the race")
+                        self.stats.record(name, False, time.time() - start)
+                        del pending[handle]
+                        continue
+
+                    links = extract_links(self.driver, engine, max_results)
+                    if not links:
+                        continue
+                    if mode == "first" and len(links) < max_results:
+                        found[name] = links     # best so far, keep polling the tab
+                        continue
+
+                    self.stats.record(name, True, time.time() - start)
+                    del pending[handle]
+                    found[name] = links
+                    print(f"[SUCCESS] Found {len(links)} valid links from {name} in {time.time() - start:.2f}s")
+
+                    if mode == "first":
+                        self.last_engine = name
+                        return links
+
+                if pending:
+                    time.sleep(self.POLL_INTERVAL)
+
+            # whoever is still pending missed the deadline (unless it had a short list)
+            for name in pending.values():
+                self.stats.record(name, name in found, time.time() - start)
+
+            if mode == "first" and found:
+                # nobody filled max_results: longest short list, priority breaks ties
+                name = max(self.stats.ordered(list(found)), key=lambda n: len(found[n]))
+                print(f"[INFO] No engine returned {max_results} links, using {len(found[name])} from {name}")
+                self.last_engine = name
+                return found[name]
+
+            self.last_engine = "merge"
+            return self.merge(found, max_results)
+        finally:
+            self.close_tabs(tabs, original)
+            self.stats.save()
+
+    def merge(self, found: dict, max_results: int):
+        """
+        round-robin over engines in priority order, dropping duplicates
+        """
+        order = [name for name in self.stats.ordered(list(found)) if found[name]]
+        merged = []
+        seen = set()
+        i = 0
+        while len(merged) < max_results and any(i < len(found[n]) for n in order):
+            for name in order:
+                if i < len(found[name]) and found[name][i] not in seen:
+                    seen.add(found[name][i])
+                    merged.append(found[name][i])
+            i += 1
+        return merged[:max_results]
+
+    def close_tabs(self, tabs, original):
+        for handle in tabs:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(original)
@@ -0,0 +1,180 @@
+# ==============================
+# supervisor.py
+# keeps a webdriver session alive:
+#   - navigation with a page-load deadline (slow pages are stopped, not fatal)
+#   - watchdog thread: a guarded call that overruns its deadline means a hung
+#     renderer / chromedriver, the browser is killed so the call fails fast
+#   - restart with a fresh browser, callers resume where they were
+# ==============================
+
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from urllib3.exceptions import HTTPError
+from websocket import WebSocketException  # installed with selenium
+
+from agent import instrument
+from agent.browser import PAGE_LOAD_TIMEOUT
+from agent.cdp import CdpError, CdpSession, debugger_address
+
+
+# what a dead or killed browser looks like to the caller: webdriver calls,
+# chromedriver's http connection, our own devtools sockets (blocker, prefetch)
+DRIVER_ERRORS = (WebDriverException, HTTPError, ConnectionError, CdpError, WebSocketException)
+
+
+def close_over_devtools(driver):
+    """
+    ask chrome itself to exit (Browser.close on the browser target), for when
+    its processes cannot be listed
+    """
+    try:
+        with CdpSession.for_browser(debugger_address(driver)) as session:
+            session.send("Browser.close", timeout=2)
+    except Exception:
+        pass  # already gone, or the answer never came because it exited
+
+
+def kill_browser(driver):
+    """
+    kill chromedriver and its chrome processes (children need psutil, without
+    it chrome is closed over devtools: it does not exit with chromedriver)
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return
+    try:
+        import psutil
+    except ImportError:
+        # the connect itself may hang on a wedged browser, do not wait on it forever
+        closer = threading.Thread(target=close_over_devtools, args=(driver,), daemon=True)
+        closer.start()
+        closer.join(3)
+    else:
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.Error:
+            children = []
+        for child in children:
+            try:
+                child.kill()
+            except psutil.Error:
+                pass
+    try:
+        process.kill()
+    except Exception:
+        pass
+
+
+class DriverSupervisor:
+    """
+    owns the driver for BrowserAgent
+    Responsibilities:
+    - load pages under a deadline
+    - detect hangs in guarded calls and kill the stuck browser
+    - replace a dead browser with a new one from the factory
+    """
+    WATCH_INTERVAL = 0.5
+
+    def __init__(self, driver, factory, page_load_timeout: float = PAGE_LOAD_TIMEOUT,
+                 hang_timeout: float = 45, max_restarts: int = 5):
+        """
+        driver: the running driver (may be attached to a warm browser)
+        factory: callable returning a new driver after a crash
+        hang_timeout: seconds a guarded call may take before the browser is killed
+        """
+        self.driver = driver
+        self.factory = factory
+        self.page_load_timeout = page_load_timeout
+        self.hang_timeout = hang_timeout
+        self.max_restarts = max_restarts
+        self.restarts = 0
+
+        self.busy = None    # (label, deadline) of the guarded call in progress
+        self.hung = None    # label of the call the watchdog had to kill
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.watchdog = threading.Thread(target=self.watch, daemon=True)
+        self.watchdog.start()
+
+    @contextmanager
+    def guard(self, label: str, seconds: float = None):
+        """
+        run a block of driver calls under a deadline enforced by the watchdog
+        """
+        with self.lock:
+            self.busy = (label, time.monotonic() + (seconds or self.hang_timeout))
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.busy = None
+
+    def watch(self):
+        while not self.stopped.wait(self.WATCH_INTERVAL):
+            with self.lock:
+                overdue = self.busy is not None and time.monotonic() > self.busy[1]
+                if overdue:
+                    self.hung = self.busy[0]
+                    self.busy = None
+            if overdue:
+                print(f"[WARNING] Browser hung during {self.hung}, killing it")
+                kill_browser(self.driver)
+
+    def load(self, url: str):
+        """
+        navigate, returns False when the page-load deadline hit (loading is
+        stopped and the partial page is kept), raises DRIVER_ERRORS on a crash
+        """
+        with self.guard("navigation", self.page_load_timeout + 15), instrument.span("navigate"):
+            try:
+                self.driver.get(url)
+                return True
+            except TimeoutException:
+                self.driver.execute_script("window.stop();")
+                return False
+
+    def failure_reason(self, error):
+        """
+        short label for the tracker: watchdog kill, timeout or crash
+        """
+        if self.hung:
+            return f"hang:{self.hung}"
+        if isinstance(error, TimeoutException):
+            return "timeout"
+        return f"crash:{type(error).__name__}"
+
+    def restart(self, counted: bool = True):
+        """
+        throw the current browser away and start a new one, returns the new driver
+        raises RuntimeError after max_restarts
+        counted: False for planned restarts (memory), only failures use up max_restarts
+        """
+        if counted and self.restarts >= self.max_restarts:
+            raise RuntimeError(f"browser restarted {self.restarts} times, giving up")
+
+        old = self.driver
+        # quit can hang on a wedged browser, do not wait for it forever
+        quitter = threading.Thread(target=lambda: self.quit_quietly(old), daemon=True)
+        quitter.start()
+        quitter.join(5)
+        if quitter.is_alive():
+            kill_browser(old)
+
+        if counted:
+            self.restarts += 1
+        self.hung = None
+        self.driver = self.factory()
+        return self.driver
+
+    @staticmethod
+    def quit_quietly(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        self.stopped.set()
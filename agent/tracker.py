@@ -1,56 +1,223 @@
 # ==============================
 # tracker.py
 # logs sites visited and time spent
+#   - one typed record per visit (monotonic timings)
+#   - records stream to an append-only JSONL file
 # ==============================
 
+import json
+import os
+import threading
 import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from agent import instrument
+from agent.paths import state_file
+
+
+@dataclass
+class Visit:
+    """
+    one visit to one url, times in seconds relative to `started`
+    """
+    url: str
+    engine: Optional[str] = None         # search engine that supplied the link
+    query: Optional[str] = None          # search query that found the link
+    started_at: float = 0.0              # wall clock (epoch) for humans
+    started: float = 0.0                 # monotonic clock, not exported
+    duration: float = 0.0
+    load_time: Optional[float] = None
+    first_scroll: Optional[float] = None
+    pixels: int = 0
+    steps: int = 0
+    reached_end: bool = False
+    pause_time: float = 0.0
+    blocked_requests: int = 0            # request interception (agent/blocker.py)
+    allowed_requests: int = 0
+    allowed_bytes: int = 0
+    budget_hit: bool = False
+    error: Optional[str] = None          # page load timeout, browser hang / crash
+    paused_since: Optional[float] = field(default=None, repr=False)
+
+    def to_record(self):
+        record = asdict(self)
+        del record["started"], record["paused_since"]
+        for key in ("started_at", "duration", "load_time", "first_scroll", "pause_time"):
+            if record[key] is not None:
+                record[key] = round(record[key], 3)
+        return record
+
+
+def format_duration(seconds: float):
+    minutes = int(seconds // 60)
+    return f"{minutes}m {seconds - minutes * 60:.1f}s"
 
 
 class SessionTracker:
     """
-    TODO: tracks session stats
+    tracks session stats
     Responsibilities:
     - record start/end time for each site
-    - compute total time spent
+    - record load time, scrolling and pauses per visit
+    - stream finished visits to disk, keep only running totals in memory
     - return summary for dashboard
     """
 
-    def __init__(self):
-        self.records = []
-        self.current_site = None
-        self.start_time = None
+    def __init__(self, path=None, clock=time.monotonic, sink=None, wall_clock=time.time):
+        """
+        path: JSONL file to append to (default ~/.assa/sessions/<timestamp>.jsonl)
+        clock: monotonic time source
+        wall_clock: epoch time source for started_at (replays pass a virtual one)
+        sink: optional text stream that gets every record line as well (batch mode)
+        """
+        if path is None:
+            os.makedirs(state_file("sessions"), exist_ok=True)
+            path = os.path.join(state_file("sessions"), time.strftime("%Y%m%d-%H%M%S") + ".jsonl")
+        self.path = path
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.file = open(path, "a", encoding="utf-8")
+        self.sink = sink
+
+        self.current = None
+        # running totals, memory stays flat however long the session is
+        self.visits = 0
+        self.total_time = 0.0
+        self.total_pixels = 0
+        self.total_blocked = 0
+        self.total_bytes = 0
+        self.failures = 0
+        # pool workers record from their own threads
+        self.lock = threading.Lock()
+
+    def new_visit(self, url: str, engine: str = None, query: str = None):
+        """
+        start timing a visit without making it the current one (pool workers)
+        """
+        visit = Visit(url=url, engine=engine, query=query, started_at=self.wall_clock(), started=self.clock())
+        instrument.begin_visit(url, visit.started_at)  # per-visit histograms follow this thread
+        return visit
+
+    def start_site(self, url: str, engine: str = None):
+        """
+        record start time for a site
+        """
+        self.current = self.new_visit(url, engine)
+        return self.current
+
+    def mark_loaded(self, visit: Visit = None):
+        visit = visit or self.current
+        if visit is not None and visit.load_time is None:
+            visit.load_time = self.clock() - visit.started
+
+    def mark_scroll(self, pixels: int, visit: Visit = None):
+        visit = visit or self.current
+        if visit is None:
+            return
+        if visit.first_scroll is None:
+            visit.first_scroll = self.clock() - visit.started
+        visit.pixels += pixels
+        visit.steps += 1
 
-    def start_site(self, url: str):
+    def mark_requests(self, counts: dict, visit: Visit = None):
         """
-        TODO: record start time for a site
+        blocked / allowed request counts from RequestBlocker.take_counts()
         """
-        self.current_site = url
-        self.start_time = time.time()  # record start time
+        visit = visit or self.current
+        if visit is not None:
+            for key, value in counts.items():
+                setattr(visit, key, value)
+
+    def mark_failure(self, reason: str, visit: Visit = None):
+        visit = visit or self.current
+        if visit is not None:
+            visit.error = reason
+
+    def mark_end(self, visit: Visit = None):
+        visit = visit or self.current
+        if visit is not None:
+            visit.reached_end = True
 
-    def end_site(self):
+    def pause(self, visit: Visit = None):
+        visit = visit or self.current
+        if visit is not None and visit.paused_since is None:
+            visit.paused_since = self.clock()
+
+    def resume(self, visit: Visit = None):
+        visit = visit or self.current
+        if visit is not None and visit.paused_since is not None:
+            visit.pause_time += self.clock() - visit.paused_since
+            visit.paused_since = None
+
+    def end_site(self, visit: Visit = None):
         """
-        TODO: record end time, compute duration
+        record end time, compute duration, stream the record to disk
         """
-        if self.current_site is None or self.start_time is None:
+        visit = visit or self.current
+        if visit is None:
             return
 
-        end_time = time.time()
-        duration = end_time - self.start_time
-        minutes = int(duration // 60)
-        seconds = int(duration % 60)
-        time_str = f"{minutes}m {seconds}s"
+        self.resume(visit)
+        visit.duration = self.clock() - visit.started
+        self.write(visit)
+        instrument.end_visit()
 
-        self.records.append({
-            "url": self.current_site,
-            "time_spent": time_str
-        })
+        if visit is self.current:
+            self.current = None
 
-        # reset current site
-        self.current_site = None
-        self.start_time = None
+    def add_record(self, url: str, duration: float, **fields):
+        """
+        record a visit timed elsewhere
+        """
+        visit = Visit(url=url, started_at=self.wall_clock() - duration, duration=duration, **fields)
+        self.write(visit)
+
+    def write(self, visit: Visit):
+        line = json.dumps(visit.to_record(), separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            if self.sink is not None:
+                self.sink.write(line + "\n")
+                self.sink.flush()
+            self.visits += 1
+            self.total_time += visit.duration
+            self.total_pixels += visit.pixels
+            self.total_blocked += visit.blocked_requests
+            self.total_bytes += visit.allowed_bytes
+            self.failures += visit.error is not None
+
+    def log_event(self, event: str, **fields):
+        """
+        session event that is not a visit (eg memory recycling), same file
+        """
+        line = json.dumps(dict(event=event, at=round(self.wall_clock(), 3), **fields), separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def iter_records(self):
+        """
+        read every visit of this session back from disk (events are skipped)
+        """
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if "event" not in record:
+                        yield record
 
     def get_summary(self):
         """
-        TODO: return list of sites + durations
+        iterator over visit records (dicts), streamed from the session file
         """
-        return self.records
+        return self.iter_records()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
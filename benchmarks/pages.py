@@ -0,0 +1,104 @@
+# ==============================
+# pages.py
+# synthetic pages for benchmarks, served from a local http server:
+#   /short     - fits in one screen
+#   /tall      - ~30000px of static text
+#   /infinite  - appends content near the bottom (capped)
+#   /heavy     - tall page with a very large DOM
+# ==============================
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PARAGRAPH = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8 + "</p>"
+
+
+def page(title: str, body: str, script: str = ""):
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'>"
+        f"<title>{title}</title>"
+        "<style>body{margin:0;font:16px/1.5 sans-serif} p{margin:0 0 16px}</style>"
+        f"</head><body>{body}<script>{script}</script></body></html>"
+    )
+
+
+def short_page():
+    return page("short", PARAGRAPH * 2)
+
+
+def tall_page():
+    return page("tall", "<div style='height:30000px'>" + PARAGRAPH * 300 + "</div>")
+
+
+def infinite_page(batches: int = 10):
+    # adds a screenful batch whenever the reader gets close to the bottom
+    script = f"""
+    var added = 0;
+    function more() {{
+        if (added >= {batches}) {{ return; }}
+        added += 1;
+        var div = document.createElement('div');
+        div.style.height = '3000px';
+        div.innerHTML = {PARAGRAPH * 20!r};
+        document.body.appendChild(div);
+    }}
+    window.addEventListener('scroll', function () {{
+        if (window.pageYOffset + window.innerHeight > document.body.scrollHeight - 1500) {{
+            setTimeout(more, 200);  // pretend network latency
+        }}
+    }});
+    """
+    return page("infinite", "<div style='height:3000px'>" + PARAGRAPH * 20 + "</div>", script)
+
+
+def heavy_page(nodes: int = 20000):
+    cells = "".join(f"<span class='c{i % 10}'>{i}</span>" for i in range(nodes))
+    return page("heavy", f"<div style='display:flex;flex-wrap:wrap;width:100%'>{cells}</div>" + PARAGRAPH * 200)
+
+
+PAGES = {
+    "short": short_page,
+    "tall": tall_page,
+    "infinite": infinite_page,
+    "heavy": heavy_page,
+}
+
+
+class PageServer:
+    """
+    serves PAGES on 127.0.0.1 from a background thread
+    """
+
+    def __init__(self, port: int = 0):
+        rendered = {f"/{name}": build().encode() for name, build in PAGES.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = rendered.get(self.path.split("?")[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep benchmark output clean
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name: str):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/{name}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
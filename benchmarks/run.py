@@ -0,0 +1,231 @@
+# ==============================
+# run.py
+# scroll throughput / navigation latency benchmark
+#   - serves synthetic pages locally (benchmarks/pages.py)
+#   - drives headless chrome through the real Scroller
+#   - reports px/sec vs target, step latency percentiles,
+#     time to first scroll, cpu and rss
+#
+# usage:
+#   python -m benchmarks.run --out bench.json
+#   python -m benchmarks.run --out new.json --compare bench.json
+# ==============================
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.pages import PAGES, PageServer
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# regression thresholds used by --compare
+MAX_RATE_DROP = 0.10       # achieved px/sec may drop at most 10%
+MAX_LATENCY_RISE = 0.25    # p95 step latency may rise at most 25%
+
+
+def percentile(ordered, p: float):
+    """
+    nearest-rank percentile of an already sorted list
+    """
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def chrome_usage(driver):
+    """
+    (cpu seconds, rss MB) of chromedriver + chrome processes, None without psutil
+    """
+    try:
+        import psutil  # optional
+    except ImportError:
+        return None, None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+    except Exception:
+        return None, None
+
+    cpu, rss = 0.0, 0
+    for proc in procs:
+        try:
+            times = proc.cpu_times()
+            cpu += times.user + times.system
+            rss += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return cpu, rss / 1e6
+
+
+def own_usage():
+    """
+    (cpu seconds, peak rss MB) of this python process, rss is None on windows
+    """
+    try:
+        import resource  # unix only
+    except ImportError:
+        return time.process_time(), None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KB on linux, bytes on macOS
+    scale = 1e6 if sys.platform == "darwin" else 1e3
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss / scale
+
+
+def bench_page(driver, url: str, speed: str, mode: str, duration: float):
+    """
+    load one page and scroll it for `duration` seconds (or until the end)
+    """
+    from agent.scroller import Scroller
+
+    py_cpu_start, _ = own_usage()
+    chrome_cpu_start, _ = chrome_usage(driver)
+
+    start = time.perf_counter()
+    driver.get(url)
+    navigation = time.perf_counter() - start
+
+    scroller = Scroller(driver, speed, mode)
+    latencies = []
+    first_scroll = None
+    reached_end = False
+    scroll_start = time.perf_counter()
+    start_position = driver.execute_script("return window.pageYOffset")
+
+    while time.perf_counter() - scroll_start < duration:
+        step_start = time.perf_counter()
+        more = scroller.scroll_step(wait=False)
+        latencies.append(time.perf_counter() - step_start)
+        if first_scroll is None:
+            first_scroll = time.perf_counter() - start
+        if not more:
+            reached_end = True
+            break
+        time.sleep(scroller.tick_interval())
+
+    elapsed = time.perf_counter() - scroll_start
+    scroller.stop_raf()
+    position = driver.execute_script("return window.pageYOffset")
+
+    py_cpu_end, py_rss = own_usage()
+    chrome_cpu_end, chrome_rss = chrome_usage(driver)
+
+    latencies.sort()
+    return {
+        "target_px_per_sec": round(scroller.rate, 1),
+        "achieved_px_per_sec": round((position - start_position) / elapsed, 1) if elapsed else 0.0,
+        "steps": len(latencies),
+        "step_ms_p50": round(percentile(latencies, 50) * 1000, 3),
+        "step_ms_p95": round(percentile(latencies, 95) * 1000, 3),
+        "step_ms_p99": round(percentile(latencies, 99) * 1000, 3),
+        "navigation_ms": round(navigation * 1000, 1),
+        "first_scroll_ms": round((first_scroll or 0) * 1000, 1),
+        "reached_end": reached_end,
+        "python_cpu_s": round(py_cpu_end - py_cpu_start, 3),
+        "python_peak_rss_mb": round(py_rss, 1) if py_rss is not None else None,
+        "chrome_cpu_s": round(chrome_cpu_end - chrome_cpu_start, 3) if chrome_cpu_end is not None else None,
+        "chrome_rss_mb": round(chrome_rss, 1) if chrome_rss is not None else None,
+    }
+
+
+def git_version():
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pages, speeds, modes, duration: float, headless: bool = True):
+    from agent.browser import create_driver
+
+    results = []
+    driver = create_driver(headless=headless)
+    try:
+        with PageServer() as server:
+            for name in pages:
+                for speed in speeds:
+                    for mode in modes:
+                        result = bench_page(driver, server.url(name), speed, mode, duration)
+                        result.update(page=name, speed=speed, mode=mode)
+                        results.append(result)
+                        print(f"[BENCH] {name:9s} {speed:6s} {mode:4s} "
+                              f"{result['achieved_px_per_sec']:8.1f}/{result['target_px_per_sec']:.0f} px/s  "
+                              f"p95 {result['step_ms_p95']:.2f}ms  first scroll {result['first_scroll_ms']:.0f}ms")
+    finally:
+        driver.quit()
+
+    return {
+        "version": git_version(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duration_s": duration,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """
+    print regressions against a baseline file, returns number of regressions
+    """
+    key = lambda r: (r["page"], r["speed"], r["mode"])
+    old = {key(r): r for r in baseline["results"]}
+    regressions = 0
+
+    for result in current["results"]:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        problems = []
+        if before["achieved_px_per_sec"] and \
+                result["achieved_px_per_sec"] < before["achieved_px_per_sec"] * (1 - MAX_RATE_DROP):
+            problems.append(f"px/s {before['achieved_px_per_sec']} -> {result['achieved_px_per_sec']}")
+        if before["step_ms_p95"] and \
+                result["step_ms_p95"] > before["step_ms_p95"] * (1 + MAX_LATENCY_RISE):
+            problems.append(f"p95 {before['step_ms_p95']}ms -> {result['step_ms_p95']}ms")
+        if problems:
+            regressions += 1
+            print(f"[REGRESSION] {' '.join(key(result))}: {', '.join(problems)}")
+
+    if not regressions:
+        print(f"[INFO] No regressions against {baseline.get('version')}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="assa scroll / navigation benchmark")
+    parser.add_argument("--out", default="bench.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--pages", default=",".join(PAGES), help="comma separated page names")
+    parser.add_argument("--speeds", default="slow,medium,fast")
+    parser.add_argument("--modes", default="step,raf")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of scrolling per case")
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    args = parser.parse_args(argv)
+
+    # make `agent` importable when run from elsewhere
+    sys.path.insert(0, REPO_DIR)
+
+    report = run(args.pages.split(","), args.speeds.split(","), args.modes.split(","),
+                 args.duration, headless=not args.headed)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(report, json.load(f)) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
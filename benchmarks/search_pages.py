@@ -0,0 +1,117 @@
+# ==============================
+# search_pages.py
+# stand-in search engines for SearchRacer, served from a local http server:
+#   /engine/<name>?q=...  - results page rendered by script: `first` results
+#                           right away, the rest after `delay_ms` (a page that
+#                           is still loading when the race polls it)
+#   engine_table(server)  - SEARCH_ENGINES-style table pointing at the server
+#
+# usage:
+#   with SearchPageServer({"slow": {"results": 5, "first": 2, "delay_ms": 1500}}) as server:
+#       SearchRacer(driver, engines=engine_table(server)).race("query")
+# ==============================
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+
+# name -> how its results page behaves
+DEFAULT_ENGINES = {
+    "quick": {"results": 5, "first": 5, "delay_ms": 300},
+    "partial": {"results": 5, "first": 2, "delay_ms": 2000},
+}
+
+
+def result_links(name: str, query: str, count: int):
+    """
+    result urls an engine page lists for a query (not served, only extracted)
+    """
+    return [f"http://results.invalid/{name}/{i}?q={quote_plus(query)}" for i in range(count)]
+
+
+def results_page(name: str, query: str, results: int, first: int, delay_ms: int):
+    items = [{"href": href, "title": f"{name} result {i}", "snippet": f"snippet {i} for {query}"}
+             for i, href in enumerate(result_links(name, query, results))]
+    # the page shows nothing until its script runs, like the real engines
+    script = f"""
+    var items = {json.dumps(items)};
+    function show(from, to) {{
+        items.slice(from, to).forEach(function (item) {{
+            var div = document.createElement('div');
+            div.className = 'result';
+            div.innerHTML = '<h2><a></a></h2><p class="snippet"></p>';
+            div.querySelector('a').href = item.href;
+            div.querySelector('a').textContent = item.title;
+            div.querySelector('p').textContent = item.snippet;
+            document.getElementById('results').appendChild(div);
+        }});
+    }}
+    show(0, {first});
+    setTimeout(function () {{ show({first}, items.length); }}, {delay_ms});
+    """
+    return ("<!doctype html><html><head><meta charset='utf-8'>"
+            f"<title>{name}</title></head><body><div id='results'></div>"
+            f"<script>{script}</script></body></html>")
+
+
+class SearchPageServer:
+    """
+    serves one results page per stand-in engine on 127.0.0.1 from a background thread
+    """
+
+    def __init__(self, engines=None, port: int = 0):
+        self.engines = engines or DEFAULT_ENGINES
+        engines = self.engines
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                name = parts.path[len("/engine/"):] if parts.path.startswith("/engine/") else None
+                if name not in engines:
+                    self.send_error(404)
+                    return
+                query = parse_qs(parts.query).get("q", [""])[0]
+                body = results_page(name, query, **engines[name]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep test output clean
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, name: str):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/engine/{name}?q={{query}}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def engine_table(server: SearchPageServer):
+    """
+    SEARCH_ENGINES entries for every stand-in engine of the server
+    """
+    return {
+        name: {
+            "url": server.url(name),
+            "selector": "div.result h2 a",
+            "link_is_parent": False,
+            "result": "div.result",
+            "snippet": "p.snippet",
+            "exclude": ["127.0.0.1"],
+            "captcha_check": False,
+        }
+        for name in server.engines
+    }
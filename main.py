@@ -1,39 +1,269 @@
+import argparse
 import sys
-from agent.agent import BrowserAgent
+
+# only the standard library is imported up here: --help, --dry-run and cache
+# lookups never pay for selenium / rich / keyboard, each mode imports its own
+# subsystem when it runs
+
+
+# headless browsers in batch mode unless --workers says otherwise
+BATCH_WORKERS = 4
+
+# modules each mode loads, used by --profile-imports
+MODE_MODULES = {
+    "batch": ["agent.batch", "agent.pool", "agent.dashboard"],
+    "async": ["asyncio", "agent.async_agent"],
+    "interactive": ["agent.agent"],
+    "replay": ["agent.replay", "agent.agent"],
+}
+
+
+def speed_arg(value: str):
+    """
+    --speed: preset name or a positive px/sec number, checked before any browser starts
+    """
+    from agent.scroller import speed_rate  # no selenium behind it, --help stays cheap
+
+    try:
+        speed_rate(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected slow / medium / fast or a positive px/sec number, got {value!r}")
+    return value if value in ("slow", "medium", "fast") else float(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="assa - automated scrolling browser agent")
+    parser.add_argument("query", nargs="*", help="search term (asked for when missing)")
+    parser.add_argument("--workers", type=int, default=0, help="parallel headless browsers")
+    parser.add_argument("--speed", type=speed_arg, default="slow", help="px/sec or slow / medium / fast")
+    parser.add_argument("--links", type=int, default=5, help="links per search")
+    parser.add_argument("--fast", "-f", action="store_true", help="fast demo mode")
+    parser.add_argument("--raf", action="store_true", help="in-page requestAnimationFrame scroll loop")
+    parser.add_argument("--race", action="store_true", help="race all search engines")
+    parser.add_argument("--merge", action="store_true", help="merge results of all search engines")
+    parser.add_argument("--http", action="store_true", help="browserless search backend")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the search cache")
+    parser.add_argument("--refresh", action="store_true", help="search again and update the cache")
+    parser.add_argument("--no-daemon", action="store_true", help="do not attach to a warm browser")
+    parser.add_argument("--revisit", action="store_true", help="include pages visited in the last 24h")
+    parser.add_argument("--prefetch", type=int, default=0, help="links to preload in background tabs")
+    parser.add_argument("--prefetch-mem", type=float, default=1500, help="MB of chrome RSS to stop prefetching at")
+    parser.add_argument("--page-budget", type=float, default=0, help="KB per page before blocking everything")
+    parser.add_argument("--block", action="store_true", help="block ads, trackers, media and fonts")
+    parser.add_argument("--block-scripts", action="store_true", help="also block third-party scripts")
+    parser.add_argument("--tabs", type=int, default=3,
+                        help="recently left pages kept open for instant back / forward, 0 = reload")
+    parser.add_argument("--mem-limit", type=float, default=2000, help="MB of chrome RSS before recycling, 0 = off")
+    parser.add_argument("--extract", type=int, default=0, metavar="N",
+                        help="save page text / headings / links every N scroll steps")
+    parser.add_argument("--batch", metavar="FILE", help="unattended mode, one query per line (- for stdin)")
+    parser.add_argument("--out", help="batch mode: append visit records here instead of stdout")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="asyncio core over devtools")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the resolved settings and cached links, start no browser")
+    parser.add_argument("--record", action="store_true",
+                        help="save a replayable trace (commands, scroll positions, page snapshots)")
+    parser.add_argument("--replay", metavar="DIR", help="replay a recorded trace against its snapshots")
+    parser.add_argument("--speedup", type=float, default=0,
+                        help="replay: 0 = as fast as possible, 1 = real time")
+    parser.add_argument("--instrument", metavar="FILE",
+                        help="time the hot paths, write p50/p95/p99 per span and visit as JSON")
+    parser.add_argument("--trace", metavar="FILE", help="also write a Chrome trace-event file")
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="report where the startup time of the chosen mode goes")
+    return parser
+
+
+def mode_of(args):
+    if args.batch:
+        return "batch"
+    if args.replay:
+        return "replay"
+    if args.use_async:
+        return "async"
+    return "interactive"
+
+
+def block_rules_of(args):
+    if not (args.block or args.page_budget):
+        return None
+    from agent.blocker import BlockRules
+    return BlockRules(block_third_party_scripts=args.block_scripts, byte_budget=int(args.page_budget * 1024))
+
+
+def dry_run(args, queries):
+    """
+    show what a run would do, reading only the search cache
+    """
+    mode = mode_of(args)
+    workers = args.workers or (BATCH_WORKERS if mode == "batch" else 0)
+    print(f"[INFO] mode: {mode}, workers: {workers}, speed: {args.speed}, links: {args.links}")
+    if not queries:
+        return
+    if args.no_cache:
+        print("[INFO] search cache disabled")
+        return
+
+    from agent.cache import SearchCache
+    from agent.paths import state_file
+
+    cache = SearchCache(state_file("search_cache.sqlite"))
+    try:
+        for query in queries:
+            entry = cache.get_entry(query, args.links)
+            if not entry:
+                print(f"[INFO] '{query}' is not cached, a run would search")
+                continue
+            engine, links = entry
+            print(f"[INFO] '{query}' cached from {engine}:")
+            for link in links:
+                print(f"  {link}")
+    finally:
+        cache.close()
+
+
+def profile_imports(mode: str, top: int = 15):
+    """
+    import the modules of a mode in a fresh interpreter under -X importtime
+    and summarise the cost per top-level package and per module
+    """
+    import subprocess
+
+    code = "import importlib\n" + "".join(f"importlib.import_module({name!r})\n" for name in MODE_MODULES[mode])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True)
+    if result.returncode:
+        print(result.stderr, file=sys.stderr)
+        return result.returncode
+
+    modules = []    # (self us, cumulative us, name)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(own), int(cumulative), name.strip()))
+
+    packages = {}
+    for own, _, name in modules:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + own
+    total = sum(packages.values())
+
+    print(f"[INFO] {mode} mode: {len(modules)} modules imported in {total / 1000:.1f}ms")
+    print("  by package:")
+    for root, own in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {root:<28}{own / 1000:8.1f}ms {own / total:6.1%}")
+    print("  slowest modules (self time):")
+    for own, cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"    {name:<40}{own / 1000:8.1f}ms  (cumulative {cumulative / 1000:.1f}ms)")
+    return 0
+
 
 def main():
-    # check for command line arguments
-    fast = '--fast' in sys.argv or '-f' in sys.argv
-    
+    """
+    main entry function
+    1. parse options (no heavy imports yet)
+    2. get the search term
+    3. import and run the selected mode
+    """
+    args = build_parser().parse_args()
+    mode = mode_of(args)
+
+    if args.profile_imports:
+        sys.exit(profile_imports(mode))
+
+    if not (args.instrument or args.trace):
+        run(args, mode)
+        return
+
+    from agent import instrument
+    instrument.enable(trace=bool(args.trace))
+    try:
+        run(args, mode)
+    finally:
+        # stderr: batch mode keeps stdout for visit records
+        instrument.export(args.instrument, args.trace)
+
+
+def run(args, mode):
+    """
+    import and run the selected mode
+    """
+    # unattended: queries from a file / stdin, headless pool, records on stdout
+    if mode == "batch":
+        from agent.batch import read_queries, run_batch
+        if args.dry_run:
+            dry_run(args, read_queries(args.batch))
+            return
+        sys.exit(run_batch(args.batch, args.out, workers=args.workers or BATCH_WORKERS, max_links=args.links,
+                           use_cache=not args.no_cache, revisit=args.revisit,
+                           block_rules=block_rules_of(args), extract_every=args.extract))
+
+    # recorded session: links, commands and clock all come from the trace
+    if mode == "replay":
+        from agent.replay import replay_session
+        sys.exit(replay_session(args.replay, args.speedup, record=args.record))
+
     # get search term
-    search_args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
-    
-    if search_args:
-        search_term = ' '.join(search_args)
+    if args.query:
+        search_term = ' '.join(args.query)
+    elif args.dry_run:
+        search_term = ""
     else:
         search_term = input("Enter search term: ")
 
+    if args.dry_run:
+        dry_run(args, [search_term] if search_term else [])
+        return
+
     # show mode information
-    if fast:
+    if args.fast:
         print("[INFO] Running in FAST DEMO mode")
 
-    agent = BrowserAgent()
+    # asyncio core: one event loop drives one or more browsers over devtools
+    if mode == "async":
+        import asyncio
+        from agent.async_agent import run_agents
+        asyncio.run(run_agents(search_term, browsers=args.workers or 1, speed=args.speed,
+                               max_links=args.links, use_cache=not args.no_cache))
+        return
 
-    # run session
-    if fast:
-        agent.run_fast_demo(search_term)
+    from agent.agent import BrowserAgent
+
+    recorder = None
+    if args.record:
+        from agent.replay import SessionRecorder
+        recorder = SessionRecorder()
+
+    if args.merge:
+        search_mode = "merge"
+    elif args.race:
+        search_mode = "race"
     else:
-        agent.run(search_term)
+        search_mode = "serial"
 
-    
+    agent = BrowserAgent(scroll_mode="raf" if args.raf else "step", search_mode=search_mode,
+                         search_backend="http" if args.http else "browser",
+                         use_cache=not args.no_cache, refresh_cache=args.refresh,
+                         use_daemon=not args.no_daemon,
+                         prefetch_depth=args.prefetch, prefetch_memory_mb=args.prefetch_mem,
+                         block_rules=block_rules_of(args), revisit=args.revisit,
+                         memory_limit_mb=args.mem_limit, extract_every=args.extract, recorder=recorder,
+                         resident_tabs=args.tabs)
 
-    """
-    main entry function
-    1. ask user for a search term
-    2. create an instance of BrowserAgent
-    3. run the agent with that search term
-    """
-    
+    # starting speed: preset name or any px/sec number (validated by speed_arg)
+    agent.current_speed = args.speed
+
+    # run session, Ctrl+C / a crash still closes the browser and hands a warm one back
+    try:
+        if args.workers:
+            agent.run_pool(search_term, args.workers)
+        elif args.fast:
+            agent.run_fast_demo(search_term)
+        else:
+            agent.run(search_term, args.links)
+    finally:
+        agent.cleanup()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+# ==============================
+# test_search_race.py
+# SearchRacer against the stand-in engines of benchmarks/search_pages.py:
+#   - the results pages themselves (no browser needed)
+#   - a real race in headless chrome, skipped when chrome cannot start
+# ==============================
+
+import unittest
+from urllib.request import urlopen
+
+from benchmarks.search_pages import SearchPageServer, engine_table, result_links
+
+
+class StandInPagesTest(unittest.TestCase):
+
+    def test_results_page_lists_every_result(self):
+        with SearchPageServer() as server:
+            url = server.url("quick").format(query="python+tips")
+            html = urlopen(url, timeout=5).read().decode()
+        for href in result_links("quick", "python tips", 5):
+            self.assertIn(href, html)
+
+    def test_unknown_engine_is_404(self):
+        with SearchPageServer() as server:
+            url = server.url("missing").format(query="x")
+            with self.assertRaises(Exception):
+                urlopen(url, timeout=5)
+
+
+def start_chrome():
+    try:
+        from agent.browser import create_driver
+        return create_driver(headless=True)
+    except Exception:
+        return None
+
+
+class SearchRaceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.driver = start_chrome()
+        if cls.driver is None:
+            raise unittest.SkipTest("headless chrome is not available")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+
+    def racer(self, server):
+        from agent.search import EngineStats, SearchRacer
+        # "partial" first: it shows results before "quick" has any
+        stats = EngineStats()
+        stats.record("partial", True, 0.1)
+        stats.record("quick", True, 5.0)
+        return SearchRacer(self.driver, engines=engine_table(server), stats=stats)
+
+    def test_first_waits_for_a_full_result_set(self):
+        with SearchPageServer() as server:
+            racer = self.racer(server)
+            links = racer.race("python tips", mode="first", deadline=8, max_results=5)
+        self.assertEqual(racer.last_engine, "quick")
+        self.assertEqual(links, result_links("quick", "python tips", 5))
+
+    def test_first_settles_for_a_short_list_at_the_deadline(self):
+        engines = {"partial": {"results": 5, "first": 2, "delay_ms": 60_000}}
+        with SearchPageServer(engines) as server:
+            racer = self.racer(server)
+            links = racer.race("python tips", mode="first", deadline=2, max_results=5)
+        self.assertEqual(racer.last_engine, "partial")
+        self.assertEqual(links, result_links("partial", "python tips", 2))
+
+    def test_merge_round_robins_engines(self):
+        with SearchPageServer() as server:
+            racer = self.racer(server)
+            links = racer.race("python tips", mode="merge", deadline=4, max_results=4)
+        self.assertEqual(racer.last_engine, "merge")
+        self.assertEqual(len(links), 4)
+        self.assertEqual(len(set(links)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()